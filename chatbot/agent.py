@@ -2,12 +2,32 @@
 import os
 import json
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Any, Optional, Tuple
-from openai import OpenAI
+from openai import OpenAI, NOT_GIVEN
 from tools.schemas import TOOL_SCHEMAS
 from tools.implementations import ToolImplementations
 from chatbot.prompts import SYSTEM_PROMPT
 
+# Upper bound on tool calls executed concurrently within one model step
+MAX_PARALLEL_TOOL_CALLS = 8
+# Tools that only read data and may run concurrently. Anything else (orders,
+# returns, tickets) changes state and runs alone, in the order requested.
+READ_ONLY_TOOLS = frozenset({
+    "search_knowledge_base",
+    "product_catalog",
+    "check_inventory",
+    "order_status",
+    "estimate_shipping",
+    "draft_order",
+})
+
+# Cheap model used to fold older conversation turns into a running summary
+SUMMARY_MODEL = "gpt-4o-mini"
+
+# Knowledge base payload keys read when injecting SOPs
+SOP_PAYLOAD_FIELDS = ["audience", "doc_type", "title", "content"]
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -84,21 +104,30 @@ class CustomerSupportAgent:
         if not likely_tools:
             return messages
         
-        # Search for SOPs for each likely tool
+        # Use cached SOPs; look up the rest in one batched knowledge base search
         sop_contents = []
+        missing_tools = []
         for tool_name in likely_tools:
-            # Check cache first
             if tool_name in self.sop_cache:
                 sop_contents.append(self.sop_cache[tool_name])
                 logger.info(f"Using cached SOP for {tool_name}")
-                continue
-            
-            # Search knowledge base
-            search_query = f"agent-sop-{tool_name}"
+            else:
+                missing_tools.append(tool_name)
+        
+        if missing_tools:
+            search_queries = [f"agent-sop-{tool_name}" for tool_name in missing_tools]
             try:
-                results = self.tools.vector_store.search_by_text(search_query, limit=1)
+                # These queries differ by one token, so the near-duplicate search
+                # cache could hand one tool's SOP to another; sop_cache above is
+                # the exact-key cache for them
+                batch_results = self.tools.vector_store.search_batch_by_text(
+                    search_queries, limit=1, payload_fields=SOP_PAYLOAD_FIELDS,
+                    semantic_cache=False
+                )
                 
-                if results and len(results) > 0:
+                for tool_name, results in zip(missing_tools, batch_results):
+                    if not results:
+                        continue
                     payload = results[0].get('payload', {})
                     if payload.get('audience') == 'agent' and payload.get('doc_type') == 'sop':
                         sop_content = payload.get('content', '')
@@ -111,33 +140,32 @@ class CustomerSupportAgent:
                         self.sop_cache[tool_name] = formatted_sop
                         logger.info(f"Found and cached SOP for {tool_name}")
             except Exception as e:
-                logger.warning(f"Could not retrieve SOP for {tool_name}: {str(e)}")
+                logger.warning(f"Could not retrieve SOPs for {missing_tools}: {str(e)}")
         
-        # If we found SOPs, inject them as a system message after the main prompt
+        # If we found SOPs, inject them as a system message right before the
+        # latest user message. Tools + system prompt + earlier history then form
+        # a prefix that is identical from turn to turn, which OpenAI's automatic
+        # prompt caching can reuse.
         if sop_contents:
             sop_message = {
                 "role": "system",
                 "content": "RELEVANT PROCEDURES:\n\n" + "\n\n".join(sop_contents)
             }
-            # Insert after system prompt (position 1)
-            messages.insert(1, sop_message)
+            messages.insert(len(messages) - 1, sop_message)
             logger.info(f"Injected {len(sop_contents)} SOP(s) into conversation")
         
         return messages
     
-    def chat(self, user_message: str, conversation_history: Optional[List[Dict[str, Any]]] = None) -> Tuple[str, List[Dict[str, Any]]]:
-        """Process a user message and return response with tool usage.
+    def _build_messages(self, user_message: str, conversation_history: Optional[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """Build the OpenAI message list for a turn, with relevant SOPs injected.
         
         Args:
             user_message: User's message
             conversation_history: Previous conversation messages
             
         Returns:
-            Tuple of (assistant_response, tool_calls_made)
+            Messages for the API call
         """
-        if not self.client:
-            return "Error: OpenAI API key not configured. Please set OPENAI_API_KEY environment variable.", []
-        
         # Initialize conversation history
         if conversation_history is None:
             conversation_history = []
@@ -148,7 +176,130 @@ class CustomerSupportAgent:
         messages.append({"role": "user", "content": user_message})
         
         # Inject relevant SOPs based on user message
-        messages = self._inject_relevant_sops(messages, user_message)
+        return self._inject_relevant_sops(messages, user_message)
+    
+    def _run_tool_calls(self, tool_calls: List[Dict[str, Any]], messages: List[Dict[str, Any]],
+                        tool_calls_made: List[Dict[str, Any]], content: Optional[str] = None):
+        """Execute tool calls requested by the model and append their results.
+        
+        Args:
+            tool_calls: Tool calls as dicts with 'id', 'name' and 'arguments' (JSON string)
+            messages: Conversation messages; the tool results are appended
+            tool_calls_made: Tracking list; each executed call is appended
+            content: Text the model produced alongside the tool calls, if any
+        """
+        # Add assistant message to history
+        messages.append({
+            "role": "assistant",
+            "content": content or None,
+            "tool_calls": [
+                {
+                    "id": tc["id"],
+                    "type": "function",
+                    "function": {
+                        "name": tc["name"],
+                        "arguments": tc["arguments"]
+                    }
+                }
+                for tc in tool_calls
+            ]
+        })
+        
+        parsed_calls = [
+            (tool_call, tool_call["name"], json.loads(tool_call["arguments"] or "{}"))
+            for tool_call in tool_calls
+        ]
+        
+        # Knowledge base searches requested in the same step go out as one
+        # batched Qdrant lookup instead of one round trip each
+        kb_queries = {
+            tool_call["id"]: function_args["query"]
+            for tool_call, function_name, function_args in parsed_calls
+            if function_name == "search_knowledge_base" and isinstance(function_args.get("query"), str)
+        }
+        prefetched = {}
+        if len(kb_queries) > 1:
+            prefetched = dict(zip(
+                kb_queries,
+                self.tools.search_knowledge_base_batch(list(kb_queries.values()))
+            ))
+        
+        # Consecutive read-only calls run concurrently (each tool opens its own
+        # DB connection). A state-changing call is a barrier: it runs alone,
+        # after the calls before it and before the calls after it, so writes
+        # keep the model's order and never race each other or a stock check.
+        results = dict(prefetched)
+        group = []
+        
+        def run_group():
+            if len(group) > 1:
+                with ThreadPoolExecutor(max_workers=min(len(group), MAX_PARALLEL_TOOL_CALLS)) as executor:
+                    futures = {
+                        tool_call["id"]: executor.submit(self.tools.execute_tool, function_name, function_args)
+                        for tool_call, function_name, function_args in group
+                    }
+                    results.update({call_id: future.result() for call_id, future in futures.items()})
+            else:
+                for tool_call, function_name, function_args in group:
+                    results[tool_call["id"]] = self.tools.execute_tool(function_name, function_args)
+            group.clear()
+        
+        for tool_call, function_name, function_args in parsed_calls:
+            if tool_call["id"] in prefetched:
+                continue
+            if function_name in READ_ONLY_TOOLS:
+                group.append((tool_call, function_name, function_args))
+                continue
+            run_group()
+            results[tool_call["id"]] = self.tools.execute_tool(function_name, function_args)
+        run_group()
+        
+        # Record results in the order the model requested them
+        for tool_call, function_name, function_args in parsed_calls:
+            result = results[tool_call["id"]]
+            
+            # Log tool call
+            logger.info(f"=" * 80)
+            logger.info(f"TOOL CALL: {function_name}")
+            logger.info(f"Parameters: {json.dumps(function_args, indent=2)}")
+            
+            # Log tool result
+            logger.info(f"Result: {json.dumps(result, indent=2)}")
+            logger.info(f"Success: {result.get('success', False)}")
+            logger.info(f"=" * 80)
+            
+            # Track tool call
+            tool_calls_made.append({
+                "tool": function_name,
+                "arguments": function_args,
+                "result": result
+            })
+            
+            # Add tool result to messages
+            messages.append({
+                "role": "tool",
+                "tool_call_id": tool_call["id"],
+                "name": function_name,
+                "content": json.dumps(result)
+            })
+    
+    def chat(self, user_message: str, conversation_history: Optional[List[Dict[str, Any]]] = None,
+             user_id: Optional[str] = None) -> Tuple[str, List[Dict[str, Any]]]:
+        """Process a user message and return response with tool usage.
+        
+        Args:
+            user_message: User's message
+            conversation_history: Previous conversation messages
+            user_id: Stable per-conversation id sent as OpenAI's ``user``, so
+                the conversation's requests route to the same prompt cache
+            
+        Returns:
+            Tuple of (assistant_response, tool_calls_made)
+        """
+        if not self.client:
+            return "Error: OpenAI API key not configured. Please set OPENAI_API_KEY environment variable.", []
+        
+        messages = self._build_messages(user_message, conversation_history)
         
         tool_calls_made = []
         max_iterations = 5  # Prevent infinite loops
@@ -164,61 +315,26 @@ class CustomerSupportAgent:
                     messages=messages,
                     tools=TOOL_SCHEMAS,
                     tool_choice="auto",
+                    user=user_id or NOT_GIVEN,
                 )
                 
                 assistant_message = response.choices[0].message
                 
                 # Check if assistant wants to call tools
                 if assistant_message.tool_calls:
-                    # Add assistant message to history
-                    messages.append({
-                        "role": "assistant",
-                        "content": assistant_message.content,
-                        "tool_calls": [
+                    self._run_tool_calls(
+                        [
                             {
                                 "id": tc.id,
-                                "type": tc.type,
-                                "function": {
-                                    "name": tc.function.name,
-                                    "arguments": tc.function.arguments
-                                }
+                                "name": tc.function.name,
+                                "arguments": tc.function.arguments
                             }
                             for tc in assistant_message.tool_calls
-                        ]
-                    })
-                    
-                    # Execute each tool call
-                    for tool_call in assistant_message.tool_calls:
-                        function_name = tool_call.function.name
-                        function_args = json.loads(tool_call.function.arguments)
-                        
-                        # Log tool call initiation
-                        logger.info(f"=" * 80)
-                        logger.info(f"TOOL CALL: {function_name}")
-                        logger.info(f"Parameters: {json.dumps(function_args, indent=2)}")
-                        
-                        # Execute the tool
-                        result = self.tools.execute_tool(function_name, function_args)
-                        
-                        # Log tool result
-                        logger.info(f"Result: {json.dumps(result, indent=2)}")
-                        logger.info(f"Success: {result.get('success', False)}")
-                        logger.info(f"=" * 80)
-                        
-                        # Track tool call
-                        tool_calls_made.append({
-                            "tool": function_name,
-                            "arguments": function_args,
-                            "result": result
-                        })
-                        
-                        # Add tool result to messages
-                        messages.append({
-                            "role": "tool",
-                            "tool_call_id": tool_call.id,
-                            "name": function_name,
-                            "content": json.dumps(result)
-                        })
+                        ],
+                        messages,
+                        tool_calls_made,
+                        assistant_message.content
+                    )
                     
                     # Continue loop to get final response
                     continue
@@ -232,6 +348,127 @@ class CustomerSupportAgent:
         # Max iterations reached
         return "I apologize, but I'm having trouble completing this request. Let me create a support ticket for you.", tool_calls_made
     
+    def chat_stream(self, user_message: str, conversation_history: Optional[List[Dict[str, Any]]] = None,
+                    tool_calls_made: Optional[List[Dict[str, Any]]] = None, user_id: Optional[str] = None):
+        """Process a user message, yielding the answer text as it streams from OpenAI.
+        
+        Same tool loop as ``chat()``, but every completion is requested with
+        ``stream=True``: content deltas are yielded immediately, tool-call
+        deltas are accumulated and executed once the completion finishes.
+        
+        Args:
+            user_message: User's message
+            conversation_history: Previous conversation messages
+            tool_calls_made: List that executed tool calls are appended to
+                (a generator can't return them alongside the text)
+            user_id: Stable per-conversation id sent as OpenAI's ``user``
+            
+        Yields:
+            Response text chunks
+        """
+        if tool_calls_made is None:
+            tool_calls_made = []
+        
+        if not self.client:
+            yield "Error: OpenAI API key not configured. Please set OPENAI_API_KEY environment variable."
+            return
+        
+        messages = self._build_messages(user_message, conversation_history)
+        
+        max_iterations = 5  # Prevent infinite loops
+        for _ in range(max_iterations):
+            content_parts = []
+            pending_calls = {}  # tool-call index -> {"id", "name", "arguments"}
+            
+            try:
+                stream = self.client.chat.completions.create(
+                    model=self.model,
+                    messages=messages,
+                    tools=TOOL_SCHEMAS,
+                    tool_choice="auto",
+                    user=user_id or NOT_GIVEN,
+                    stream=True,
+                )
+                
+                for chunk in stream:
+                    if not chunk.choices:
+                        continue
+                    delta = chunk.choices[0].delta
+                    
+                    if delta.content:
+                        content_parts.append(delta.content)
+                        yield delta.content
+                    
+                    # Tool call name/arguments arrive in fragments keyed by index
+                    for tc in delta.tool_calls or []:
+                        call = pending_calls.setdefault(tc.index, {"id": None, "name": "", "arguments": ""})
+                        if tc.id:
+                            call["id"] = tc.id
+                        if tc.function and tc.function.name:
+                            call["name"] += tc.function.name
+                        if tc.function and tc.function.arguments:
+                            call["arguments"] += tc.function.arguments
+                
+                if not pending_calls:
+                    # No more tool calls, final response has been streamed
+                    if not content_parts:
+                        yield "I apologize, but I'm having trouble generating a response."
+                    return
+                
+                if content_parts:
+                    # Keep any preamble ("Let me check...") apart from the final answer
+                    yield "\n\n"
+                
+                self._run_tool_calls(
+                    [pending_calls[index] for index in sorted(pending_calls)],
+                    messages,
+                    tool_calls_made,
+                    "".join(content_parts)
+                )
+            
+            except Exception as e:
+                yield f"Error: {str(e)}"
+                return
+        
+        # Max iterations reached
+        yield "I apologize, but I'm having trouble completing this request. Let me create a support ticket for you."
+    
+    def summarize_history(self, previous_summary: str, messages: List[Dict[str, Any]]) -> str:
+        """Fold older conversation turns into a running summary.
+        
+        Args:
+            previous_summary: Summary of everything before ``messages`` ("" if none)
+            messages: Conversation messages being dropped from the verbatim window
+            
+        Returns:
+            Updated summary
+        """
+        if not self.client or not messages:
+            return previous_summary
+        
+        transcript = "\n".join(f"{m['role']}: {m.get('content') or ''}" for m in messages)
+        response = self.client.chat.completions.create(
+            model=SUMMARY_MODEL,
+            messages=[
+                {
+                    "role": "system",
+                    "content": (
+                        "You maintain a running summary of a customer support conversation. "
+                        "Merge the new transcript into the existing summary. Keep every concrete "
+                        "detail the agent may need later: customer name and contact details, "
+                        "order/product/ticket IDs, quantities, addresses, and open requests. "
+                        "Reply with the updated summary only, in under 200 words."
+                    )
+                },
+                {
+                    "role": "user",
+                    "content": f"Existing summary:\n{previous_summary or '(none)'}\n\nNew transcript:\n{transcript}"
+                }
+            ],
+            max_tokens=400,
+        )
+        return response.choices[0].message.content or previous_summary
+    
     def get_streaming_response(self, user_message: str, conversation_history: Optional[List[Dict[str, Any]]] = None):
         """Get streaming response (generator).
         
@@ -0,0 +1,116 @@
+"""Semantic response cache for first-turn support agent questions."""
+import os
+import re
+import time
+import logging
+import threading
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Tuple, Callable
+
+import numpy as np
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Off unless explicitly enabled for a deployment
+SEMANTIC_CACHE_ENABLED = os.getenv("ENABLE_SEMANTIC_CACHE", "").lower() in ("true", "1", "yes")
+
+# The cache is shared by every session, so only answers grounded purely in the
+# knowledge base (the same for everyone) may be replayed. Replies without tool
+# calls can echo details the user typed, and catalog/order/shipping answers
+# depend on arguments (prices, order numbers, ZIPs) that barely move the
+# embedding, so those would leak or mismatch across users.
+CACHEABLE_TOOLS = frozenset({"search_knowledge_base"})
+
+_NUMBER_PATTERN = re.compile(r"\d+")
+
+# Agent replies that signal a failed turn: an "Error: ..." line (possibly after
+# a streamed preamble) or one of the fallback apologies
+FAILED_RESPONSE_PREFIXES = ("Error", "I apologize, but I'm having trouble")
+
+
+class SemanticResponseCache:
+    """In-memory LRU of (prompt embedding -> agent response) with a TTL.
+
+    Only meant for the first turn of a conversation, where the response depends
+    on the prompt alone. A lookup is a hit when the cosine similarity between
+    the new prompt and a cached prompt is at least ``threshold`` and both
+    prompts contain the same numbers.
+    """
+
+    def __init__(self, embed_fn: Callable[[str], Any], threshold: float = 0.95,
+                 ttl_seconds: float = 600, max_entries: int = 256):
+        """Initialize the cache.
+
+        Args:
+            embed_fn: Function mapping text to an embedding vector
+            threshold: Minimum cosine similarity for a hit
+            ttl_seconds: How long an entry stays valid
+            max_entries: Maximum number of cached responses (LRU eviction)
+        """
+        self.embed_fn = embed_fn
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        # key -> (unit prompt vector, created, numbers in prompt, response, tool_calls)
+        self._entries: "OrderedDict[int, Tuple[np.ndarray, float, Tuple[str, ...], str, List[Dict[str, Any]]]]" = OrderedDict()
+        self._next_key = 0
+        self._lock = threading.Lock()
+
+    def embed(self, prompt: str) -> np.ndarray:
+        """Embed and L2-normalize a prompt so lookups are a plain dot product."""
+        vector = np.asarray(self.embed_fn(prompt.strip()), dtype=np.float32)
+        return vector / (np.linalg.norm(vector) + 1e-12)
+
+    @staticmethod
+    def _numbers(prompt: str) -> Tuple[str, ...]:
+        """Digit runs in a prompt; "under $300" and "under $500" embed almost identically."""
+        return tuple(_NUMBER_PATTERN.findall(prompt))
+
+    def get(self, vector: np.ndarray, prompt: str) -> Optional[Tuple[str, List[Dict[str, Any]]]]:
+        """Return the cached (response, tool_calls) closest to ``vector``, or None.
+
+        Only entries whose prompt contains the same numbers are considered.
+        """
+        now = time.monotonic()
+        numbers = self._numbers(prompt)
+        with self._lock:
+            # Drop expired entries first
+            expired = [key for key, (_, created, _, _, _) in self._entries.items()
+                       if now - created > self.ttl_seconds]
+            for key in expired:
+                del self._entries[key]
+
+            keys = [key for key, (_, _, entry_numbers, _, _) in self._entries.items()
+                    if entry_numbers == numbers]
+            if not keys:
+                return None
+
+            matrix = np.stack([self._entries[key][0] for key in keys])
+            scores = matrix @ vector
+            best = int(np.argmax(scores))
+            if scores[best] < self.threshold:
+                return None
+
+            key = keys[best]
+            self._entries.move_to_end(key)
+            _, _, _, response, tool_calls = self._entries[key]
+            logger.info(f"Semantic cache hit (similarity={scores[best]:.3f})")
+            return response, tool_calls
+
+    def put(self, vector: np.ndarray, prompt: str, response: str, tool_calls: List[Dict[str, Any]]):
+        """Cache a response grounded only in successful knowledge base searches."""
+        if not tool_calls:
+            return
+        if any(line.lstrip().startswith(FAILED_RESPONSE_PREFIXES) for line in response.splitlines()):
+            return
+        for call in tool_calls:
+            if call.get("tool") not in CACHEABLE_TOOLS or not call.get("result", {}).get("success", False):
+                return
+        with self._lock:
+            self._entries[self._next_key] = (
+                vector, time.monotonic(), self._numbers(prompt), response, tool_calls,
+            )
+            self._next_key += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
@@ -221,6 +221,29 @@ class DatabaseManager:
             logger.error(f"Error in get_product_by_id for product_id={product_id}: {str(e)}", exc_info=True)
             raise
     
+    def get_products_by_ids(self, product_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+        """Get several products by ID in a single query.
+        
+        Args:
+            product_ids: List of product IDs
+            
+        Returns:
+            Dictionary mapping product ID to product dictionary (missing IDs are absent)
+        """
+        try:
+            with self.get_connection() as conn:
+                with conn.cursor(cursor_factory=psycopg2.extras.DictCursor) as cursor:
+                    query = "SELECT * FROM agent_products WHERE id = ANY(%s)"
+                    params = (list(product_ids),)
+                    self._log_query(query, params)
+                    cursor.execute(query, params)
+                    results = {row['id']: self._prepare_for_json(dict(row)) for row in cursor.fetchall()}
+                    logger.info(f"get_products_by_ids query for {len(product_ids)} product_ids returned {len(results)} products")
+                    return results
+        except Exception as e:
+            logger.error(f"Error in get_products_by_ids: {str(e)}", exc_info=True)
+            raise
+    
     def check_inventory(self, product_id: int) -> Optional[int]:
         """Check inventory for a product.
         
@@ -430,6 +453,55 @@ class DatabaseManager:
             logger.error(f"Error in get_order_with_product_names for order_id={order_id}: {str(e)}", exc_info=True)
             raise
 
+    def get_order_with_items(self, order_id: int) -> Optional[Dict[str, Any]]:
+        """Get order details and items, with product names, in a single query.
+
+        Joins agent_order_items and agent_products onto the order row and
+        groups the result in Python. Items include order_item_id, product_id
+        and product_name.
+
+        Args:
+            order_id: Order ID
+
+        Returns:
+            Order dictionary with items or None
+        """
+        try:
+            with self.get_connection() as conn:
+                with conn.cursor(cursor_factory=psycopg2.extras.DictCursor) as cursor:
+                    # LEFT JOINs so an order without items still comes back
+                    query = """SELECT o.id as order_id, o.customer_name, o.customer_email, o.customer_phone,
+                                  o.street_address, o.zip_code, o.city, o.state,
+                                  o.status, o.total_amount, o.created_at, o.updated_at,
+                                  oi.id as order_item_id, oi.product_id, p.name as product_name,
+                                  oi.quantity, oi.price_at_purchase
+                           FROM agent_orders o
+                           LEFT JOIN agent_order_items oi ON oi.order_id = o.id
+                           LEFT JOIN agent_products p ON p.id = oi.product_id
+                           WHERE o.id = %s
+                           ORDER BY oi.id"""
+                    params = (order_id,)
+                    self._log_query(query, params)
+                    cursor.execute(query, params)
+                    rows = cursor.fetchall()
+
+                    if not rows:
+                        logger.info(f"get_order_with_items: No order found for order_id={order_id}")
+                        return None
+
+                    item_columns = ('order_item_id', 'product_id', 'product_name', 'quantity', 'price_at_purchase')
+                    order = {key: value for key, value in rows[0].items() if key not in item_columns}
+                    order['items'] = [
+                        self._prepare_for_json({key: row[key] for key in item_columns})
+                        for row in rows if row['order_item_id'] is not None
+                    ]
+                    logger.info(f"get_order_with_items: Retrieved order_id={order_id}, status={order.get('status')}, {len(order['items'])} items")
+
+                    return self._prepare_for_json(order)
+        except Exception as e:
+            logger.error(f"Error in get_order_with_items for order_id={order_id}: {str(e)}", exc_info=True)
+            raise
+
     def get_orders(self, status: Optional[str] = None) -> List[Dict[str, Any]]:
         """Get orders with optional status filter.
         
@@ -742,7 +814,7 @@ class DatabaseManager:
     # Return operations
     def create_return(self, order_id: int, return_reason: str, 
                      product_ids: Optional[List[int]] = None,
-                     quantities: Optional[List[int]] = None) -> int:
+                     quantities: Optional[List[int]] = None) -> Dict[str, Any]:
         """Create a return request.
         
         Args:
@@ -752,22 +824,24 @@ class DatabaseManager:
             quantities: List of quantities to return (optional - must match product_ids length)
             
         Returns:
-            New return ID
+            New return dictionary with items (same shape as get_return)
         """
         try:
             with self.get_connection() as conn:
                 with conn.cursor(cursor_factory=psycopg2.extras.DictCursor) as cursor:
+                    # Fetch every item in the order once; used both for a full-order
+                    # return and to price the requested products
+                    query = """SELECT oi.product_id, oi.quantity, oi.price_at_purchase
+                           FROM agent_order_items oi
+                           WHERE oi.order_id = %s
+                           ORDER BY oi.id"""
+                    params = (order_id,)
+                    self._log_query(query, params)
+                    cursor.execute(query, params)
+                    items = cursor.fetchall()
+                    
                     # If no specific products provided, return entire order
                     if not product_ids:
-                        # Get all items in the order
-                        query = """SELECT oi.product_id, oi.quantity, oi.price_at_purchase
-                               FROM agent_order_items oi
-                               WHERE oi.order_id = %s"""
-                        params = (order_id,)
-                        self._log_query(query, params)
-                        cursor.execute(query, params)
-                        items = cursor.fetchall()
-                        
                         if not items:
                             logger.error(f"create_return: No items found for order {order_id}")
                             raise ValueError(f"No items found for order {order_id}")
@@ -776,19 +850,17 @@ class DatabaseManager:
                         quantities = [item['quantity'] for item in items]
                         logger.info(f"create_return: No specific products provided, returning all {len(items)} items from order {order_id}")
                     
+                    # First order line per product, matching a lookup by (order_id, product_id)
+                    order_items = {}
+                    for item in items:
+                        order_items.setdefault(item['product_id'], item)
+                    
                     # Calculate total refund amount based on specific items
                     refund_total_amount = 0
                     return_items_data = []
                     
                     for product_id, quantity in zip(product_ids, quantities):
-                        # Get the price at purchase for this product
-                        query = """SELECT oi.price_at_purchase, oi.quantity as ordered_quantity
-                               FROM agent_order_items oi
-                               WHERE oi.order_id = %s AND oi.product_id = %s"""
-                        params = (order_id, product_id)
-                        self._log_query(query, params)
-                        cursor.execute(query, params)
-                        item = cursor.fetchone()
+                        item = order_items.get(product_id)
                         
                         if not item:
                             logger.error(f"create_return: Product {product_id} not found in order {order_id}")
@@ -809,26 +881,35 @@ class DatabaseManager:
                     
                     # Create the return order (single record)
                     query = """INSERT INTO agent_return_orders (order_id, return_reason, status, refund_total_amount)
-                           VALUES (%s, %s, 'pending', %s) RETURNING id"""
+                           VALUES (%s, %s, 'pending', %s)
+                           RETURNING id as return_id, order_id,
+                                  return_reason as reason, status, refund_total_amount,
+                                  created_at, updated_at, processed_at"""
                     params = (order_id, return_reason, refund_total_amount)
                     self._log_query(query, params)
                     cursor.execute(query, params)
-                    return_id = cursor.fetchone()['id']
+                    return_order = dict(cursor.fetchone())
+                    return_id = return_order['return_id']
                     logger.info(f"create_return: Created return_id={return_id} for order_id={order_id}, total_refund=${refund_total_amount}")
                     
                     # Create return items (one for each product being returned)
+                    return_order['items'] = []
                     for item_data in return_items_data:
                         query = """INSERT INTO agent_return_items (return_id, product_id, quantity, price_at_purchase)
-                               VALUES (%s, %s, %s, %s)"""
+                               VALUES (%s, %s, %s, %s)
+                               RETURNING id as return_item_id, return_id, product_id,
+                                      quantity, price_at_purchase as refund_amount,
+                                      'Item return' as reason"""
                         params = (return_id, item_data['product_id'], item_data['quantity'], item_data['price_at_purchase'])
                         self._log_query(query, params)
                         cursor.execute(query, params)
+                        return_order['items'].append(self._prepare_for_json(dict(cursor.fetchone())))
                         logger.info(f"create_return: Created return item for return_id={return_id}, product_id={item_data['product_id']}, quantity={item_data['quantity']}")
                     
                     conn.commit()
                     logger.info(f"create_return: Successfully created return_id={return_id} with {len(return_items_data)} item(s), total_refund=${refund_total_amount}")
                     
-                    return return_id
+                    return self._prepare_for_json(return_order)
         except Exception as e:
             logger.error(f"Error in create_return for order_id={order_id}: {str(e)}", exc_info=True)
             raise
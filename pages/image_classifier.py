@@ -1,5 +1,4 @@
 import streamlit as st
-from PIL import Image
 import requests
 import json
 import os
@@ -7,10 +6,18 @@ import math
 import logging
 import time
 import concurrent.futures
+import pandas as pd
 from io import BytesIO
 import nav
 from app import home_page
 
+EMOJI_MAP = {
+    'bird': '🐦',
+    'plane': '✈️',
+    'superman': '🦸',
+    'other': '📦'
+}
+
 COLD_START_HINT_SEC = 6
 COLD_START_HINT_MESSAGE = "backend may need a cold start, just a moment.."
 
@@ -172,13 +179,11 @@ uploaded_file = st.file_uploader(
 )
 
 if uploaded_file:
-    # Display uploaded image
-    image = Image.open(uploaded_file)
-    
     col1, col2 = st.columns([1, 1])
     
     with col1:
-        st.image(image, caption="Uploaded Image", use_container_width=True)
+        # Display the uploaded bytes directly -- no PIL decode/re-encode per rerun
+        st.image(uploaded_file.getvalue(), caption="Uploaded Image", width="stretch")
     
     with col2:
         st.markdown("### 🔍 Classification")
@@ -192,10 +197,10 @@ if uploaded_file:
             cold_hint = st.empty()
             result, error = None, None
             with st.spinner("Analyzing image via API..."):
-                # Convert image to bytes for API request
-                img_byte_arr = BytesIO()
-                image.save(img_byte_arr, format=image.format or 'JPEG')
-                img_byte_arr.seek(0)
+                # Send the uploaded bytes as-is; the backend does its own
+                # resize/crop/normalize, so a PIL decode + re-encode here
+                # only adds latency (and a lossy JPEG pass).
+                img_byte_arr = BytesIO(uploaded_file.getvalue())
 
                 def run_predict():
                     return predict_with_api(img_byte_arr)
@@ -243,14 +248,7 @@ if uploaded_file:
                 detection_reason = 'confident_prediction'
 
             # Display result with emoji
-            emoji_map = {
-                'bird': '🐦',
-                'plane': '✈️',
-                'superman': '🦸',
-                'other': '📦'
-            }
-            
-            emoji = emoji_map.get(predicted_class, '❓')
+            emoji = EMOJI_MAP.get(predicted_class, '❓')
             
             # Main prediction
             st.markdown(f"## {emoji} **{predicted_class.upper()}** {emoji}")
@@ -278,10 +276,12 @@ if uploaded_file:
             
             # Show all class probabilities
             st.markdown("### 📊 Confidence Breakdown:")
-            for class_name, prob in all_probs.items():
-                emoji_icon = emoji_map.get(class_name, '❓')
-                st.write(f"{emoji_icon} **{class_name.capitalize()}**: {prob * 100:.1f}%")
-                st.progress(float(prob))
+            # One chart element instead of a write + progress bar per class
+            breakdown = pd.DataFrame(
+                {"Probability (%)": [float(prob) * 100 for prob in all_probs.values()]},
+                index=[f"{EMOJI_MAP.get(name, '❓')} {name.capitalize()}" for name in all_probs],
+            )
+            st.bar_chart(breakdown, horizontal=True)
             
             # Show technical details in expander
             with st.expander("🔬 Technical Details"):
@@ -307,10 +307,7 @@ if uploaded_file:
                 st.markdown("**Current Distribution:**")
                 
                 # Show if distribution is uniform or peaked
-                prob_values_list = list(all_probs.values())
-                max_prob = max(prob_values_list)
-                min_prob = min(prob_values_list)
-                if max_prob - min_prob < 0.2:
+                if max(prob_values) - min(prob_values) < 0.2:
                     st.caption("⚖️ Flat distribution - model is very uncertain")
                 else:
                     st.caption("📊 Peaked distribution - model has a clear preference")
@@ -1,5 +1,6 @@
 import streamlit as st
 import os
+import time
 from openai import OpenAI
 import nav
 from app import home_page
@@ -57,10 +58,27 @@ with st.expander("🔧 Try It Out", expanded=False):
 
 st.write("Ready to chat? Try asking about the ocean, buried treasure, or anything else!")
 
+# Max chat messages (user + assistant) sent to OpenAI with each request
+PIRATE_HISTORY_LIMIT = 20
+
+# Streaming redraw throttle: repaint after this many seconds or new characters
+STREAM_FLUSH_SEC = 0.05
+STREAM_FLUSH_CHARS = 32
+
+PIRATE_GREETING = "Ahoy, me hearty! I be yer pirate assistant, ready to help ye navigate any question on the seven seas. What be on yer mind?"
+
+
+@st.cache_resource
+def get_openai_client(api_key):
+    """Process-wide OpenAI client so its httpx connection pool (and the TLS
+    session to api.openai.com) survives reruns."""
+    return OpenAI(api_key=api_key)
+
+
 # Get API key from environment variables
 if OPENAI_API_KEY := os.getenv('OPENAI_API_KEY'):
     st.sidebar.success('OpenAI API key is good.', icon='✅')
-    client = OpenAI(api_key=OPENAI_API_KEY)
+    client = get_openai_client(OPENAI_API_KEY)
 else:
     st.sidebar.warning('OpenAI API key not found in environment variables.', icon='⚠️')
     client = None
@@ -70,27 +88,10 @@ if "pirate_system_prompt" not in st.session_state:
     st.session_state.pirate_system_prompt = "You are a helpful assistant who speaks like a pirate. Always respond in pirate speak with phrases like 'Ahoy!', 'Arr!', and 'me hearty'."
 
 if "pirate_messages" not in st.session_state:
-    st.session_state.pirate_messages = []
-    # Add initial greeting message using the current system prompt
-    if client:
-        try:
-            # Get initial greeting from the AI using the system prompt from session state
-            initial_response = client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": st.session_state.pirate_system_prompt},
-                    {"role": "user", "content": "Greet me and introduce yourself in one or two sentences."}
-                ],
-                max_tokens=100
-            )
-            greeting = initial_response.choices[0].message.content
-            st.session_state.pirate_messages.append({"role": "assistant", "content": greeting})
-        except Exception:
-            # Fallback greeting if API call fails
-            st.session_state.pirate_messages.append({
-                "role": "assistant", 
-                "content": "Hello! I'm your AI assistant. How can I help you today?"
-            })
+    # Static greeting instead of a blocking completions call during session
+    # init -- the generated one wasn't personalized and delayed first paint by
+    # a full OpenAI round-trip on every new session.
+    st.session_state.pirate_messages = [{"role": "assistant", "content": PIRATE_GREETING}]
 
 # System prompt textbox in sidebar
 st.sidebar.subheader("System Prompt")
@@ -105,58 +106,78 @@ system_prompt = st.sidebar.text_area(
 if system_prompt != st.session_state.pirate_system_prompt:
     st.session_state.pirate_system_prompt = system_prompt
 
-# Display chat history
-st.subheader("Chat")
-for message in st.session_state.pirate_messages:
-    with st.chat_message(message["role"]):
-        st.markdown(message["content"])
-
-# Chat input
-if prompt := st.chat_input("Type your message here..."):
-    if not client:
-        st.error("Please set the OPENAI_API_KEY environment variable to use the chatbot.")
-    else:
-        # Add user message to chat history
-        st.session_state.pirate_messages.append({"role": "user", "content": prompt})
-        
-        # Display user message
-        with st.chat_message("user"):
-            st.markdown(prompt)
-        
-        # Get AI response
-        with st.chat_message("assistant"):
-            message_placeholder = st.empty()
-            full_response = ""
+
+@st.fragment
+def render_chat():
+    """Chat history, input and clear button.
+
+    Runs as a fragment so sending a message only re-executes this block,
+    not the page header, expanders and sidebar above it.
+    """
+    # Display chat history
+    st.subheader("Chat")
+    for message in st.session_state.pirate_messages:
+        with st.chat_message(message["role"]):
+            st.markdown(message["content"])
+
+    # Chat input
+    if prompt := st.chat_input("Type your message here..."):
+        if not client:
+            st.error("Please set the OPENAI_API_KEY environment variable to use the chatbot.")
+        else:
+            # Add user message to chat history
+            st.session_state.pirate_messages.append({"role": "user", "content": prompt})
             
-            try:
-                # Prepare messages for API call
-                api_messages = [
-                    {"role": "system", "content": st.session_state.pirate_system_prompt}
-                ] + st.session_state.pirate_messages
-                
-                # Stream the response
-                stream = client.chat.completions.create(
-                    model="gpt-3.5-turbo",
-                    messages=api_messages,
-                    stream=True,
-                )
-                
-                for chunk in stream:
-                    if chunk.choices[0].delta.content is not None:
-                        full_response += chunk.choices[0].delta.content
-                        message_placeholder.markdown(full_response + "▌")
-                
-                message_placeholder.markdown(full_response)
-                
-                # Add assistant response to chat history
-                st.session_state.pirate_messages.append({"role": "assistant", "content": full_response})
+            # Display user message
+            with st.chat_message("user"):
+                st.markdown(prompt)
+            
+            # Get AI response
+            with st.chat_message("assistant"):
+                message_placeholder = st.empty()
+                full_response = ""
                 
-            except Exception as e:
-                st.error(f"Error calling OpenAI API: {str(e)}")
-
-# Clear chat button
-st.divider()
-if st.button("Clear Chat History", use_container_width=False):
-    st.session_state.pirate_messages = []
-    st.rerun()
-
+                try:
+                    # Prepare messages for API call -- only the most recent turns,
+                    # so prompt size (and time to first token) stays flat as the
+                    # conversation grows
+                    api_messages = [
+                        {"role": "system", "content": st.session_state.pirate_system_prompt}
+                    ] + st.session_state.pirate_messages[-PIRATE_HISTORY_LIMIT:]
+                    
+                    # Stream the response
+                    stream = client.chat.completions.create(
+                        model="gpt-3.5-turbo",
+                        messages=api_messages,
+                        stream=True,
+                    )
+                    
+                    # Redraw on a time/size threshold rather than per token --
+                    # every .markdown() is a re-parse plus a websocket push
+                    last_flush = time.monotonic()
+                    last_len = 0
+                    for chunk in stream:
+                        if chunk.choices[0].delta.content is not None:
+                            full_response += chunk.choices[0].delta.content
+                            if (time.monotonic() - last_flush > STREAM_FLUSH_SEC
+                                    or len(full_response) - last_len > STREAM_FLUSH_CHARS):
+                                message_placeholder.markdown(full_response + "▌")
+                                last_flush = time.monotonic()
+                                last_len = len(full_response)
+                    
+                    message_placeholder.markdown(full_response)
+                    
+                    # Add assistant response to chat history
+                    st.session_state.pirate_messages.append({"role": "assistant", "content": full_response})
+                    
+                except Exception as e:
+                    st.error(f"Error calling OpenAI API: {str(e)}")
+
+    # Clear chat button
+    st.divider()
+    if st.button("Clear Chat History", use_container_width=False):
+        st.session_state.pirate_messages = []
+        st.rerun(scope="fragment")
+
+
+render_chat()
@@ -1,13 +1,15 @@
 import streamlit as st
-import io
+import hashlib
 import json
 import logging
 import os
 import sys
+import threading
 from PIL import Image
 import requests
 import time
 import getpass
+from pathlib import Path
 from random import randrange
 import nav
 from app import home_page
@@ -101,8 +103,15 @@ else:
 #     st.sidebar.warning('credentials are not working.', icon='⚠️')
 
 host = f"https://api.stability.ai/v2beta/stable-image/generate/sd3"
+STREAM_CHUNK_BYTES = 64 * 1024
 st.session_state.show_pic = False
 
+@st.cache_resource
+def get_http_session():
+    """Shared requests.Session so keep-alive connections to the Stability API
+    are reused across submissions instead of re-handshaking each time."""
+    return requests.Session()
+
 def send_generation_request(host, params,):
     headers = {
         "Accept": "image/*",
@@ -122,12 +131,18 @@ def send_generation_request(host, params,):
 
     # Send request
     logger.info("Sending REST request to %s", host)
-    response = requests.post(
-        host,
-        headers=headers,
-        files=files,
-        data=params
-    )
+    try:
+        response = get_http_session().post(
+            host,
+            headers=headers,
+            files=files,
+            data=params,
+            stream=True,
+        )
+    finally:
+        for f in files.values():
+            if hasattr(f, "close"):
+                f.close()
     if not response.ok:
         body_preview = (response.text or "")[:2000]
         logger.error(
@@ -139,9 +154,6 @@ def send_generation_request(host, params,):
 
     return response
 
-def get_bytes(content):
-    return io.BytesIO(content)
-
 # def get_image_bytes():
 #     return current_content
     
@@ -150,6 +162,25 @@ if "show_stability" not in st.session_state:
 
 placeholder = st.empty()
 
+# On-disk cache of generated images, keyed on the request params. st.cache_data
+# only lives as long as the process, and every miss is a billed generation.
+STABILITY_CACHE_DIR = Path(os.getenv("STABILITY_CACHE_DIR", "./.cache/stability"))
+
+def _cache_path(params):
+    key = hashlib.sha256(json.dumps(params, sort_keys=True).encode("utf-8")).hexdigest()
+    return STABILITY_CACHE_DIR / f"{key}.jpg"
+
+def _write_cache(path, content):
+    """Write atomically (temp file + rename) so a crash never leaves a partial image."""
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Per-thread temp name: concurrent writers of the same key must not share it
+        tmp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+        tmp_path.write_bytes(content)
+        os.replace(tmp_path, path)
+    except OSError:
+        logger.warning("Could not write Stability cache file %s", path, exc_info=True)
+
 @st.cache_data
 def hit_stability(prompt):
     params = {
@@ -160,10 +191,17 @@ def hit_stability(prompt):
         "model" : "sd3-medium"
     }
 
+    cache_path = _cache_path(params)
+    if cache_path.is_file():
+        logger.info("Stability: serving cached image %s", cache_path.name)
+        return cache_path.read_bytes()
+
     response = send_generation_request(host,params)
 
-    # Decode response
-    content = response.content
+    # Decode response -- read the streamed body in large chunks, then release
+    # the connection back to the session pool
+    with response:
+        content = b"".join(response.iter_content(chunk_size=STREAM_CHUNK_BYTES))
     finish_reason = response.headers.get("finish-reason")
     # seed = response.headers.get("seed")
 
@@ -171,7 +209,11 @@ def hit_stability(prompt):
     if finish_reason == 'CONTENT_FILTERED':
         raise Warning("Generation failed NSFW classifier")
 
-    return io.BytesIO(content)
+    _write_cache(cache_path, content)
+
+    # Raw bytes: st.image and st.download_button both accept them directly,
+    # so no BytesIO/BufferedReader wrapping (and extra copies) downstream
+    return content
 
 # move logic to here later
 def fake_hit_stab():
@@ -183,10 +225,10 @@ img_prompt = st.text_area("What would you like to see?", parrot_caption)
 st.divider()
 click = st.button("See It!", help="submit your prompt and get an image", use_container_width=False)
 
-def fragment_function(img_BufferedReader):
+def fragment_function(img_bytes):
     dl_click = st.download_button(
       label="Download Image",
-      data=img_BufferedReader,
+      data=img_bytes,
       file_name="generated_image.png",
       mime="image/jpeg",
       )
@@ -213,8 +255,7 @@ if st.session_state.show_stability:
                 "hit_stability() has completed, we have the bytes"
             )
         placeholder = st.image(img_bytes, caption=img_prompt)
-        img_BufferedReader = io.BufferedReader(img_bytes)
-        fragment_function(img_BufferedReader)
+        fragment_function(img_bytes)
     except Exception:
         logger.exception("Stability page: image generation or display failed")
         st.error(
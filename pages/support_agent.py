@@ -1,9 +1,11 @@
 import streamlit as st
-import streamlit.components.v1 as components
 import os
+import json
 import sys
 import logging
-from pathlib import Path
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 import nav
 from app import home_page
 
@@ -20,6 +22,14 @@ nav.config_navigation(home_page)
 # Configure logging (don't import from app.py to avoid rendering homepage)
 logger = logging.getLogger(__name__)
 
+# Chat messages rendered by default; older ones sit behind a button
+VISIBLE_MESSAGE_LIMIT = 20
+
+# Turns (user + assistant) sent to the LLM verbatim; older turns are folded
+# into a running summary, refreshed once SUMMARY_EVERY_TURNS more have aged out
+HISTORY_WINDOW_TURNS = 6
+SUMMARY_EVERY_TURNS = 4
+
 # Check if we should show the data views instead
 query_params = st.query_params
 show_data_views = query_params.get("view") == "data"
@@ -38,10 +48,9 @@ if show_data_views:
     </style>
     """, unsafe_allow_html=True)
     
-    # Execute the data views script
-    views_path = Path(__file__).parent.parent / 'views' / 'All_Data_Views.py'
-    with open(views_path, 'r', encoding='utf-8') as f:
-        exec(f.read())
+    # Render the data views (imported once per process, not re-read and exec'd)
+    from views.All_Data_Views import render as render_data_views
+    render_data_views()
     st.stop()
 
 # Custom CSS
@@ -84,28 +93,152 @@ def initialize_session_state():
     if "messages" not in st.session_state:
         st.session_state.messages = []
     
+    if "session_id" not in st.session_state:
+        st.session_state.session_id = uuid.uuid4().hex
+    
     if "conversation_history" not in st.session_state:
         st.session_state.conversation_history = []
     
-    # Lazy initialization - only create agent when needed
-    if "agent" not in st.session_state:
-        st.session_state.agent = None
+    if "history_summary" not in st.session_state:
+        st.session_state.history_summary = ""
+        st.session_state.history_summarized_upto = 0
     
     if "tool_usage" not in st.session_state:
         st.session_state.tool_usage = []
     
+    if "tool_counter" not in st.session_state:
+        st.session_state.tool_counter = Counter()
+    
     if "show_welcome" not in st.session_state:
         st.session_state.show_welcome = True
+    
+    if "show_earlier_messages" not in st.session_state:
+        st.session_state.show_earlier_messages = False
+
+
+def _build_agent():
+    """Construct the agent (OpenAI, Postgres and Qdrant clients)."""
+    # Import only when needed
+    from chatbot.agent import CustomerSupportAgent
+    return CustomerSupportAgent()
+
+
+def _warm_embedder(agent_future):
+    """Load the FastEmbed model once the agent exists, ahead of the first search."""
+    if agent_future.exception() is not None:
+        return
+    try:
+        agent_future.result().tools.vector_store.warm_up()
+    except Exception as e:
+        logger.warning(f"Embedder warmup failed: {str(e)}")
+
+
+@st.cache_resource(show_spinner=False)
+def _start_agent_warmup():
+    """Start building the agent on a background thread, once per process.
+
+    Called when the page renders, so client setup and the embedder load
+    overlap with the user reading the page and typing their first message.
+    No Streamlit calls happen on the worker thread.
+
+    Returns:
+        Future resolving to the CustomerSupportAgent
+    """
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="support-agent-warmup")
+    agent_future = executor.submit(_build_agent)
+    executor.submit(_warm_embedder, agent_future)
+    executor.shutdown(wait=False)
+    return agent_future
+
+
+@st.cache_resource(show_spinner="Initializing AI agent...")
+def _get_agent():
+    """Build the agent once per process and share it across sessions.
+
+    The agent holds no per-conversation state (history is passed into
+    ``chat()``), so every tab can reuse the same OpenAI/Qdrant clients and
+    SOP cache instead of rebuilding them per session. Blocks only if the
+    background warmup hasn't finished yet.
+    """
+    try:
+        return _start_agent_warmup().result()
+    except Exception:
+        # Don't keep a failed warmup around; the next call starts a new one
+        _start_agent_warmup.clear()
+        raise
 
 
 def get_agent():
     """Lazy initialization of the agent - only create when first needed."""
-    if st.session_state.agent is None:
-        # Import only when needed
-        from chatbot.agent import CustomerSupportAgent
-        with st.spinner("Initializing AI agent..."):
-            st.session_state.agent = CustomerSupportAgent()
-    return st.session_state.agent
+    return _get_agent()
+
+
+@st.cache_resource
+def _get_response_cache():
+    """Process-wide semantic cache for first-turn answers (ENABLE_SEMANTIC_CACHE)."""
+    from chatbot.response_cache import SemanticResponseCache
+    return SemanticResponseCache(get_agent().tools.vector_store.embed_text)
+
+
+def stream_with_cache(agent, prompt, conversation_history, first_turn, turn):
+    """Stream ``agent.chat_stream``, short-circuiting repeated first-turn questions.
+
+    Only the first turn is cached: later turns depend on the conversation so
+    far, which a prompt-only key can't capture.
+
+    Args:
+        turn: Dict with 'tool_calls' (list) and 'cache_hit' (bool), filled in
+            as the stream is consumed
+
+    Yields:
+        Response text chunks
+    """
+    from chatbot.response_cache import SEMANTIC_CACHE_ENABLED
+    cache = vector = None
+    if SEMANTIC_CACHE_ENABLED and first_turn:
+        cache = _get_response_cache()
+        try:
+            vector = cache.embed(prompt)
+        except Exception as e:
+            logger.warning(f"Semantic cache disabled for this turn: {str(e)}")
+            cache = None
+
+    if cache is not None:
+        cached = cache.get(vector, prompt)
+        if cached is not None:
+            response, tool_calls = cached
+            turn["tool_calls"].extend(tool_calls)
+            turn["cache_hit"] = True
+            yield response
+            return
+
+    parts = []
+    for chunk in agent.chat_stream(prompt, conversation_history, turn["tool_calls"],
+                                   user_id=st.session_state.session_id):
+        parts.append(chunk)
+        yield chunk
+
+    if cache is not None:
+        cache.put(vector, prompt, "".join(parts), turn["tool_calls"])
+
+
+@st.cache_resource(show_spinner=False)
+def _tool_descriptions():
+    """Tool name -> description, built once per process (lazy import)."""
+    from tools.schemas import get_tool_descriptions
+    return get_tool_descriptions()
+
+
+def clear_conversation():
+    """Reset the conversation; used as the Clear Conversation button callback."""
+    st.session_state.messages = []
+    st.session_state.conversation_history = []
+    st.session_state.history_summary = ""
+    st.session_state.history_summarized_upto = 0
+    st.session_state.tool_usage = []
+    st.session_state.tool_counter = Counter()
+    st.session_state.show_welcome = True
+    st.session_state.show_earlier_messages = False
 
 
 def render_sidebar():
@@ -123,33 +256,22 @@ def render_sidebar():
 
         # Tool usage statistics
         st.markdown("### 📊 Tool Usage (This Session)")
-        if st.session_state.tool_usage:
-            tool_counts = {}
-            for usage in st.session_state.tool_usage:
-                tool_name = usage['tool']
-                tool_counts[tool_name] = tool_counts.get(tool_name, 0) + 1
-            
-            for tool_name, count in sorted(tool_counts.items(), key=lambda x: x[1], reverse=True):
+        if st.session_state.tool_counter:
+            for tool_name, count in st.session_state.tool_counter.most_common():
                 st.metric(tool_name, count)
         else:
             st.info("No tools used yet")
         
         # Clear conversation button
-        if st.button("🗑️ Clear Conversation", use_container_width=True):
-            st.session_state.messages = []
-            st.session_state.conversation_history = []
-            st.session_state.tool_usage = []
-            st.session_state.show_welcome = True
-            st.rerun()
+        # (callback runs before the script, so the cleared state renders without an extra rerun)
+        st.button("🗑️ Clear Conversation", use_container_width=True, on_click=clear_conversation)
         
         st.divider()
         
         # Available Tools section at the bottom
         st.markdown("### 🔧 Available Tools")
         
-        # Get tool descriptions (lazy import)
-        from tools.schemas import get_tool_descriptions
-        tool_descriptions = get_tool_descriptions()
+        tool_descriptions = _tool_descriptions()
         
         for tool_name, description in tool_descriptions.items():
             with st.expander(f"📌 {tool_name}"):
@@ -179,10 +301,11 @@ def render_tool_calls(tool_calls):
             
             st.markdown(f"**{i}. {tool_name}**")
             
-            # Arguments
+            # Arguments (pre-serialized when the turn was recorded)
             with st.container():
                 st.caption("Arguments:")
-                st.json(arguments)
+                arg_str = call.get('_arg_str') or json.dumps(arguments, indent=2, default=str)
+                st.code(arg_str, language="json")
             
             # Result
             if success:
@@ -198,9 +321,132 @@ def render_tool_calls(tool_calls):
                 st.divider()
 
 
+def history_for_llm():
+    """Conversation history to send with the next turn.
+    
+    Turns not yet summarized go verbatim (capped, in case summarization keeps
+    failing), preceded by the running summary of everything older, so input
+    tokens stay bounded however long the session runs.
+    """
+    history = st.session_state.conversation_history
+    max_messages = (HISTORY_WINDOW_TURNS + SUMMARY_EVERY_TURNS) * 2
+    recent = history[max(st.session_state.history_summarized_upto, len(history) - max_messages):]
+    
+    if st.session_state.history_summary:
+        return [{
+            "role": "system",
+            "content": "SUMMARY OF EARLIER CONVERSATION:\n" + st.session_state.history_summary
+        }] + recent
+    return recent
+
+
+def maybe_summarize_history():
+    """Fold turns that left the verbatim window into the running summary.
+    
+    Runs after the reply is on screen, and only once SUMMARY_EVERY_TURNS
+    turns have aged out, so it rarely costs the user any wait.
+    """
+    history = st.session_state.conversation_history
+    keep_from = len(history) - HISTORY_WINDOW_TURNS * 2
+    start = st.session_state.history_summarized_upto
+    if keep_from - start < SUMMARY_EVERY_TURNS * 2:
+        return
+    
+    try:
+        st.session_state.history_summary = get_agent().summarize_history(
+            st.session_state.history_summary,
+            history[start:keep_from]
+        )
+        st.session_state.history_summarized_upto = keep_from
+        logger.info(f"Summarized conversation history through message {keep_from}")
+    except Exception as e:
+        logger.warning(f"Could not summarize conversation history: {str(e)}")
+
+
+def handle_prompt(prompt):
+    """Render one chat turn inline and record it in session state.
+    
+    Both messages are drawn in place as they happen, so no full rerun is
+    needed afterwards; the next interaction renders them from history.
+    
+    Args:
+        prompt: The user's message
+    """
+    # Display user message
+    with st.chat_message("user"):
+        st.markdown(prompt)
+    
+    first_turn = not st.session_state.messages
+    
+    # Prior turns for the LLM (taken before this prompt is recorded; the agent
+    # appends the new user message itself)
+    llm_history = history_for_llm()
+    
+    # Add user message to chat history
+    st.session_state.messages.append({"role": "user", "content": prompt})
+    st.session_state.conversation_history.append({"role": "user", "content": prompt})
+    
+    # Get agent response
+    with st.chat_message("assistant"):
+        # Initialize agent on first use
+        agent = get_agent()
+        
+        # Paint tokens as they arrive instead of blocking on the full answer
+        turn = {"tool_calls": [], "cache_hit": False}
+        response = st.write_stream(stream_with_cache(
+            agent,
+            prompt,
+            llm_history,
+            first_turn,
+            turn
+        ))
+        tool_calls = turn["tool_calls"]
+        cache_hit = turn["cache_hit"]
+        
+        # Serialize arguments once; every later rerun renders the stored string
+        for call in tool_calls:
+            call['_arg_str'] = json.dumps(call['arguments'], indent=2, default=str)
+        
+        # Log response summary
+        logger.info(f"\n{'='*80}")
+        logger.info(f"USER QUERY: {prompt}")
+        logger.info(f"TOOLS USED: {len(tool_calls)}{' (cached response)' if cache_hit else ''}")
+        if tool_calls:
+            for idx, tool_call in enumerate(tool_calls, 1):
+                logger.info(f"  {idx}. {tool_call['tool']}")
+        logger.info(f"{'='*80}\n")
+        
+        # Display tool calls
+        if tool_calls:
+            logger.info(f"Rendering {len(tool_calls)} tool call(s) in UI")
+            render_tool_calls(tool_calls)
+            
+            # Update tool usage tracking (cached answers didn't run any tools)
+            if not cache_hit:
+                st.session_state.tool_usage.extend(tool_calls)
+                st.session_state.tool_counter.update(call['tool'] for call in tool_calls)
+            logger.info(f"Total tools used in session: {len(st.session_state.tool_usage)}")
+    
+    # Add assistant message to chat history
+    st.session_state.messages.append({
+        "role": "assistant",
+        "content": response,
+        "tool_calls": tool_calls
+    })
+    st.session_state.conversation_history.append({
+        "role": "assistant",
+        "content": response
+    })
+    
+    maybe_summarize_history()
+
+
 # Initialize session state
 initialize_session_state()
 
+# Start building the agent in the background while the page renders
+_start_agent_warmup()
+
 # Header
 st.title("💬 Agentic Customer Support System")
 
@@ -272,9 +518,6 @@ st.caption("Powered by OpenAI GPT-4 with function calling | PostgreSQL (Supabase
 
 st.divider()
 
-# Sidebar
-render_sidebar()
-
 # Main content area
 col1, col2 = st.columns([3, 1])
 
@@ -282,23 +525,8 @@ with col1:
     st.markdown("### Chat")
 
 with col2:
-    # Button to open all data views in a new browser tab
-    components.html("""
-        <div style="display: flex; justify-content: center; align-items: center; height: 100%;">
-            <button onclick="window.open('/support_agent?view=data', '_blank')" style="
-                padding: 0.5rem 1rem;
-                background-color: #FF4B4B;
-                color: white;
-                border: none;
-                border-radius: 0.5rem;
-                cursor: pointer;
-                font-size: 0.9rem;
-                font-weight: 500;
-            ">
-                📊 View Product and Order Data
-            </button>
-        </div>
-    """, height=50)
+    # Button to open all data views in a new browser tab (a plain link, no iframe)
+    st.link_button("📊 View Product and Order Data", "/support_agent?view=data", width="stretch")
 
 # Check API key for later use
 api_key_configured = bool(os.getenv("OPENAI_API_KEY"))
@@ -311,8 +539,18 @@ if st.session_state.show_welcome:
         st.markdown(WELCOME_MESSAGE)
     st.session_state.show_welcome = False
 
-# Display chat messages
-for message in st.session_state.messages:
+# Display chat messages -- only the most recent ones unless asked, so a
+# long session doesn't re-render every past turn on each interaction
+messages = st.session_state.messages
+hidden_count = len(messages) - VISIBLE_MESSAGE_LIMIT
+if hidden_count > 0 and not st.session_state.show_earlier_messages:
+    st.button(
+        f"⬆️ Show {hidden_count} earlier message(s)",
+        on_click=lambda: st.session_state.update(show_earlier_messages=True)
+    )
+    messages = messages[-VISIBLE_MESSAGE_LIMIT:]
+
+for message in messages:
     with st.chat_message(message["role"]):
         st.markdown(message["content"])
         
@@ -325,58 +563,9 @@ if prompt := st.chat_input("How can I help you today?"):
     # Check API key
     if not api_key_configured:
         st.error("⚠️ Please configure OPENAI_API_KEY environment variable to use the chatbot.")
-        st.stop()
-    
-    # Display user message
-    with st.chat_message("user"):
-        st.markdown(prompt)
-    
-    # Add user message to chat history
-    st.session_state.messages.append({"role": "user", "content": prompt})
-    st.session_state.conversation_history.append({"role": "user", "content": prompt})
-    
-    # Get agent response
-    with st.chat_message("assistant"):
-        with st.spinner("Thinking..."):
-            # Initialize agent on first use
-            agent = get_agent()
-            response, tool_calls = agent.chat(
-                prompt,
-                st.session_state.conversation_history
-            )
-        
-        # Log response summary
-        logger.info(f"\n{'='*80}")
-        logger.info(f"USER QUERY: {prompt}")
-        logger.info(f"TOOLS USED: {len(tool_calls)}")
-        if tool_calls:
-            for idx, tool_call in enumerate(tool_calls, 1):
-                logger.info(f"  {idx}. {tool_call['tool']}")
-        logger.info(f"{'='*80}\n")
-        
-        # Display response
-        st.markdown(response)
-        
-        # Display tool calls
-        if tool_calls:
-            logger.info(f"Rendering {len(tool_calls)} tool call(s) in UI")
-            render_tool_calls(tool_calls)
-            
-            # Update tool usage tracking
-            st.session_state.tool_usage.extend(tool_calls)
-            logger.info(f"Total tools used in session: {len(st.session_state.tool_usage)}")
-    
-    # Add assistant message to chat history
-    st.session_state.messages.append({
-        "role": "assistant",
-        "content": response,
-        "tool_calls": tool_calls
-    })
-    st.session_state.conversation_history.append({
-        "role": "assistant",
-        "content": response
-    })
-    
-    # Rerun to update the UI
-    st.rerun()
+    else:
+        handle_prompt(prompt)
 
+# Sidebar -- rendered last so its tool usage totals include this run's turn
+# without a second full-script rerun
+render_sidebar()
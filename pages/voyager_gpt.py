@@ -1,14 +1,22 @@
 import streamlit as st
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import os
+import json
 import logging
 import time
+import threading
 import concurrent.futures
 import nav
 from app import home_page
 
 COLD_START_HINT_SEC = 6
 COLD_START_HINT_MESSAGE = "backend may need a cold start, just a moment.."
+# Ping /health this often while the page is in use (Cloud Run idles out after ~5 min)
+KEEPWARM_INTERVAL_SEC = 240
+# Stop pinging once no session has rerun the page for this long
+KEEPWARM_IDLE_SEC = 15 * 60
 
 
 def run_with_cold_start_hint(request_fn, hint_placeholder):
@@ -24,9 +32,36 @@ def run_with_cold_start_hint(request_fn, hint_placeholder):
             time.sleep(0.25)
         return future.result()
 
-# Configure logging
+def read_generation(response, placeholder):
+    """Parse a 200 /generate response into the result dict.
+
+    Handles both contracts: a Server-Sent Events stream (``data: {"text": ...}``
+    events, painted into ``placeholder`` as they arrive; non-text fields such
+    as generation_time are merged into the result) and the plain JSON body.
+    """
+    if not response.headers.get("Content-Type", "").startswith("text/event-stream"):
+        return response.json()
+
+    metadata = {}
+
+    def text_chunks():
+        for line in response.iter_lines(decode_unicode=True):
+            if not line or not line.startswith("data: "):
+                continue
+            data = line[len("data: "):]
+            if data == "[DONE]":
+                break
+            event = json.loads(data)
+            metadata.update({k: v for k, v in event.items() if k != "text"})
+            if event.get("text"):
+                yield event["text"]
+
+    with response:
+        text = placeholder.write_stream(text_chunks())
+    return {**metadata, "text": text if isinstance(text, str) else "".join(text)}
+
+# Configure logging (root handlers and LOG_LEVEL are set up once in app.py)
 logger = logging.getLogger(__name__)
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 
 # Page configuration
 st.set_page_config(
@@ -99,6 +134,40 @@ st.divider()
 # Configuration
 API_URL = os.getenv("BRYCEGPT_API_URL", "http://localhost:8080")
 
+
+@st.cache_resource
+def get_session():
+    """Shared requests.Session so /health, /generate and /vocab reuse
+    keep-alive connections to Cloud Run instead of re-handshaking TLS each call."""
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=8,
+        # Retry only failures to connect (for any method, POST included: nothing
+        # reached the server). Read timeouts and error statuses are not retried,
+        # so /health and /vocab fail after one timeout instead of three.
+        max_retries=Retry(connect=2, read=0, status=0, backoff_factor=0.3),
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({"User-Agent": "resume-app/1.0"})
+    return session
+
+
+@st.cache_data(persist="disk", show_spinner=False)
+def load_vocab(model_name, api_url):
+    """Fetch a model's vocabulary; it's fixed per trained model, so repeat
+    clicks are served from cache instead of Cloud Run. The cache is pickled
+    to disk and survives app restarts (persisted caches don't take a ttl).
+
+    Raises:
+        requests.HTTPError: on a non-200 response (errors aren't cached)
+    """
+    response = get_session().get(f"{api_url}/vocab/{model_name}", timeout=120)
+    response.raise_for_status()
+    return response.json()
+
+
 # Optional manual API check (sidebar); not required before generate
 if "api_healthy" not in st.session_state:
     st.session_state.api_healthy = None
@@ -106,24 +175,109 @@ if "api_status_message" not in st.session_state:
     st.session_state.api_status_message = ""
 
 
-def check_api_health():
-    """Optional manual health check (allows Cloud Run cold start)."""
+def probe_api_health(api_url):
+    """GET /health (allows Cloud Run cold start).
+
+    Safe to call off the script thread -- touches no Streamlit state.
+
+    Returns:
+        Tuple of (healthy, status_message)
+    """
     try:
-        response = requests.get(f"{API_URL}/health", timeout=20)
+        response = get_session().get(f"{api_url}/health", timeout=20)
         if response.status_code == 200:
-            st.session_state.api_healthy = True
-            st.session_state.api_status_message = "✅ API is connected and ready!"
-        else:
-            st.session_state.api_healthy = False
-            st.session_state.api_status_message = f"❌ API returned status {response.status_code}"
+            return True, "✅ API is connected and ready!"
+        return False, f"❌ API returned status {response.status_code}"
     except requests.exceptions.Timeout:
-        st.session_state.api_healthy = False
-        st.session_state.api_status_message = "⏱️ API health check timed out"
+        return False, "⏱️ API health check timed out"
     except Exception as e:
-        st.session_state.api_healthy = False
-        st.session_state.api_status_message = f"❌ Could not connect to API: {str(e)}"
+        return False, f"❌ Could not connect to API: {str(e)}"
+
+
+@st.cache_data(ttl=60, show_spinner=False)
+def cached_api_health(api_url):
+    """probe_api_health shared across sessions for 60s, so visitors arriving
+    together trigger one /health probe between them."""
+    return probe_api_health(api_url)
+
+
+def check_api_health():
+    """Optional manual health check (always live); stores the result in session state."""
+    st.session_state.api_healthy, st.session_state.api_status_message = probe_api_health(API_URL)
+
+
+@st.cache_resource
+def get_warmup_executor():
+    """Background worker for the page-load /health probe."""
+    return concurrent.futures.ThreadPoolExecutor(max_workers=2, thread_name_prefix="voyager-warmup")
+
+
+# Cloud Run scales to zero: probe /health in the background as soon as a
+# session opens the page, so the container warms up while the user reads and
+# types instead of during their first /generate
+if "health_probe" not in st.session_state:
+    st.session_state.health_probe = get_warmup_executor().submit(cached_api_health, API_URL)
+
+
+@st.cache_resource
+def get_keepwarm(api_url):
+    """Start one daemon thread per process that keeps the Cloud Run backend warm.
+
+    It pings /health every KEEPWARM_INTERVAL_SEC, but only while some session
+    has used the page in the last KEEPWARM_IDLE_SEC, so an idle app still
+    lets the backend scale to zero.
+
+    Returns:
+        Shared dict; mark_active() sets "last_active" on each page or panel run
+    """
+    activity = {"last_active": time.monotonic()}
+    session = get_session()
+
+    def keep_warm():
+        while True:
+            time.sleep(KEEPWARM_INTERVAL_SEC)
+            if time.monotonic() - activity["last_active"] > KEEPWARM_IDLE_SEC:
+                continue
+            try:
+                session.get(f"{api_url}/health", timeout=10)
+            except Exception as e:
+                logger.debug(f"Keep-warm ping failed: {e}")
+
+    threading.Thread(target=keep_warm, daemon=True, name="voyager-keepwarm").start()
+    return activity
+
 
-# Sidebar for generation parameters
+def mark_active():
+    """Record page use for the keep-warm thread (call from fragments too, as they skip top-level code)."""
+    get_keepwarm(API_URL)["last_active"] = time.monotonic()
+
+
+mark_active()
+
+
+def render_api_status(polling=False):
+    """Show the API status, adopting the background probe's result once it's in (never blocks).
+
+    Args:
+        polling: True when running as the run_every fragment that waits on the probe
+    """
+    if st.session_state.api_healthy is None and st.session_state.health_probe.done():
+        st.session_state.api_healthy, st.session_state.api_status_message = st.session_state.health_probe.result()
+    if polling and st.session_state.health_probe.done():
+        # run_every is only re-evaluated on a full run; rerun the app once so
+        # the fragment is rebuilt without the 2s timer
+        st.rerun()
+    
+    if st.session_state.api_healthy is True:
+        st.success(st.session_state.api_status_message)
+    elif st.session_state.api_healthy is False:
+        st.error(st.session_state.api_status_message)
+    elif not st.session_state.health_probe.done():
+        st.info("⏳ Waking up the API...")
+    else:
+        st.caption("Optional: click 'Check API Status' to verify the service before generating.")
+
+# Sidebar: API status
 with st.sidebar:
     # API Status
     st.subheader("🔌 API Status")
@@ -135,48 +289,13 @@ with st.sidebar:
         st.rerun()
     
     st.caption(f"Endpoint: {API_URL}")
-    if st.session_state.api_healthy is True:
-        st.success(st.session_state.api_status_message)
-    elif st.session_state.api_healthy is False:
-        st.error(st.session_state.api_status_message)
-    else:
-        st.caption("Optional: click 'Check API Status' to verify the service before generating.")
-    
-    # Generation parameters
-    st.subheader("🎛️ Generation Parameters")
-    
-    model = st.selectbox(
-        "Model",
-        options=["shakespeare", "voyager"],
-        index=0,
-        help="Choose which model to use for text generation"
-    )
-    
-    seed = st.number_input(
-        "Seed",
-        min_value=0,
-        max_value=999999,
-        value=42,
-        help="Random seed for reproducibility"
-    )
-    
-    temperature = st.slider(
-        "Temperature",
-        min_value=0.01,
-        max_value=2.0,
-        value=0.8,
-        step=0.01,
-        help="Higher = more random, Lower = more deterministic"
-    )
-    
-    max_tokens = st.number_input(
-        "Max Tokens",
-        min_value=1,
-        max_value=500,
-        value=100,
-        step=10,
-        help="Maximum number of tokens to generate"
-    )
+    # While the page-load probe is pending, poll it as a fragment so the
+    # status fills in by itself without rerunning the page
+    probe_pending = not st.session_state.health_probe.done()
+    st.fragment(
+        render_api_status,
+        run_every=2 if probe_pending else None
+    )(polling=probe_pending)
 
 # Context parameter on main page
 st.markdown("### 📝 Context (Optional)")
@@ -186,207 +305,357 @@ st.markdown("Provide starting text to guide the model's generation. Generated te
 if "context_text" not in st.session_state:
     st.session_state.context_text = ""
 
-# Initialize generating state
-if "is_generating" not in st.session_state:
-    st.session_state.is_generating = False
-
-# Text area is disabled during generation
-# Use value parameter instead of key to allow programmatic updates
-context_input = st.text_area(
-    "Starting text",
-    value=st.session_state.context_text,
-    height=300,
-    help="Optional context for text generation (leave empty for none)",
-    placeholder="Enter your starting text here...",
-    disabled=st.session_state.is_generating
+# Model stays outside the form: the vocabulary section below follows it too
+model = st.selectbox(
+    "Model",
+    options=["shakespeare", "voyager"],
+    index=0,
+    help="Choose which model to use for text generation"
 )
 
-# Update session state with current value (unless generating)
-if not st.session_state.is_generating:
-    st.session_state.context_text = context_input
-
-st.caption("💡 Try: 'To be or not to be' (Shakespeare) | 'Shields down, warp engines are offline' (Voyager)")
+# Alongside the /health probe, prefetch the selected model's vocabulary so
+# "Load Vocabulary" is a cache hit (load_vocab is st.cache_data)
+if "vocab_prefetch" not in st.session_state:
+    st.session_state.vocab_prefetch = get_warmup_executor().submit(
+        lambda model_name=model: load_vocab(model_name, API_URL)
+    )
 
 # Initialize session state for results
 if "show_results" not in st.session_state:
     st.session_state.show_results = False
 if "result_data" not in st.session_state:
     st.session_state.result_data = None
+if "variant_texts" not in st.session_state:
+    st.session_state.variant_texts = None
+
+
+def post_generate_json(payload):
+    """POST one non-streaming /generate request and return its JSON body."""
+    response = get_session().post(f"{API_URL}/generate", json=payload, timeout=120)
+    response.raise_for_status()
+    return response.json()
+
+
+def append_variant(text):
+    """Append the chosen variant to the context and drop the others."""
+    st.session_state.context_text += text
+    st.session_state.variant_texts = None
+
+
+# The generate and vocabulary panels are fragments: submitting the form or
+# loading the vocabulary reruns only that panel, not the page around it
+@st.fragment
+def generate_panel(model):
+    """Context form, Generate handlers, and the result / variant display."""
+    mark_active()
+    # Context, parameters and the Generate button share one form, so typing,
+    # slider drags and number tweaks don't rerun the script until Generate is hit
+    with st.form("generate_form", border=False):
+        # Use value parameter instead of key to allow programmatic updates
+        context_input = st.text_area(
+            "Starting text",
+            value=st.session_state.context_text,
+            height=300,
+            help="Optional context for text generation (leave empty for none)",
+            placeholder="Enter your starting text here..."
+        )
+        
+        st.caption("💡 Try: 'To be or not to be' (Shakespeare) | 'Shields down, warp engines are offline' (Voyager)")
+        
+        # Generation parameters
+        st.markdown("#### 🎛️ Generation Parameters")
+        seed_col, temperature_col, max_tokens_col, variants_col = st.columns(4)
+        
+        with seed_col:
+            seed = st.number_input(
+                "Seed",
+                min_value=0,
+                max_value=999999,
+                value=42,
+                help="Random seed for reproducibility"
+            )
+        
+        with temperature_col:
+            temperature = st.slider(
+                "Temperature",
+                min_value=0.01,
+                max_value=2.0,
+                value=0.8,
+                step=0.01,
+                help="Higher = more random, Lower = more deterministic"
+            )
+        
+        with max_tokens_col:
+            max_tokens = st.number_input(
+                "Max Tokens",
+                min_value=1,
+                max_value=500,
+                value=100,
+                step=10,
+                help="Maximum number of tokens to generate"
+            )
+        
+        with variants_col:
+            variants = st.number_input(
+                "Variants",
+                min_value=1,
+                max_value=4,
+                value=1,
+                help="Generate several continuations in parallel (seeds seed, seed+1, ...) and pick one to append"
+            )
+        
+        generate_clicked = st.form_submit_button("🚀 Generate Text", type="primary", use_container_width=True)
 
-# Main interface - Generate button
-if st.button("🚀 Generate Text", type="primary", use_container_width=True, disabled=st.session_state.is_generating):
-    # Capture the current context before setting generating state
-    current_context = st.session_state.context_text
-    
-    # Set generating state and rerun to update UI immediately
-    st.session_state.is_generating = True
-    st.rerun()
-
-# If we're generating, run the generation process
-if st.session_state.is_generating:
-    # Get the context that was saved when button was clicked
-    current_context = st.session_state.context_text
-    
-    # Clear previous results
-    st.session_state.show_results = False
-    st.session_state.result_data = None
-    
-    cold_hint = st.empty()
-    with st.spinner("Generating text..."):
-        try:
-            # Make API request
-            context_value = None
-            if current_context.strip():
-                # Convert context to array of characters or tokens
-                context_value = list(current_context.strip())
-            
-            payload = {
-                "seed": int(seed),
+    # Update session state with current value
+    st.session_state.context_text = context_input
+
+    # Variants mode: fan out one request per seed on the pooled session so the
+    # backend's inference latency overlaps instead of adding up
+    if generate_clicked and variants > 1:
+        current_context = st.session_state.context_text
+        st.session_state.show_results = False
+        st.session_state.result_data = None
+        st.session_state.variant_texts = None
+        
+        context_value = list(current_context.strip()) if current_context.strip() else None
+        payloads = [
+            {
+                "seed": int(seed) + i,
                 "temperature": float(temperature),
                 "max_tokens": int(max_tokens),
                 "context": context_value,
                 "model": model
             }
-            
-            # Log the request for debugging
-            logger.info(f"Making API request with model={model}, seed={seed}, temperature={temperature}, max_tokens={max_tokens}, context_length={len(context_value) if context_value else 0}")
-            
-            def post_generate():
-                return requests.post(
-                    f"{API_URL}/generate",
-                    json=payload,
-                    timeout=120
-                )
-
-            response = run_with_cold_start_hint(post_generate, cold_hint)
-            
-            if response.status_code == 200:
-                result = response.json()
+            for i in range(int(variants))
+        ]
+        logger.info(f"Making {len(payloads)} parallel API requests with model={model}, base seed={seed}")
+        
+        cold_hint = st.empty()
+        with st.status(f"Generating {len(payloads)} variants...", expanded=True) as status:
+            try:
+                with concurrent.futures.ThreadPoolExecutor(max_workers=len(payloads)) as executor:
+                    results = run_with_cold_start_hint(
+                        lambda: list(executor.map(post_generate_json, payloads)),
+                        cold_hint
+                    )
+                cold_hint.empty()
                 
-                # Check if response contains the expected "text" field
-                if "text" in result:
-                    # Log successful generation
-                    text_preview = result["text"][:50] + "..." if len(result["text"]) > 50 else result["text"]
-                    logger.info(f"Successfully generated text (preview): {text_preview}")
-                    logger.info(f"Current context length: {len(current_context)}, API response length: {len(result['text'])}, max_tokens: {max_tokens}")
-                    
-                    # Extract only the last max_tokens characters (the newly generated portion)
-                    # The API returns context + generated text, so the last portion is new
-                    generated_only = result["text"][-max_tokens:] if len(result["text"]) >= max_tokens else result["text"]
-                    logger.info(f"Extracted last {len(generated_only)} characters as newly generated text")
-                    
-                    # Update context with the new generated text
-                    st.session_state.context_text = current_context + generated_only
-                    
-                    # Store results in session state for details display
-                    st.session_state.show_results = True
-                    st.session_state.result_data = {
-                        "text": generated_only,  # Store only the newly generated portion
-                        "generation_time": result.get("generation_time"),
-                        "tokens": result.get("tokens"),
-                        "payload": payload,
-                        "success": True
-                    }
-                    
-                    # Clear generating state
-                    st.session_state.is_generating = False
-                    st.rerun()
+                # Check every response contains the expected "text" field
+                failed = next((result for result in results if "text" not in result), None)
+                if failed is None:
+                    st.session_state.variant_texts = [
+                        result["text"][-max_tokens:] for result in results
+                    ]
+                    status.update(label="Variants ready", state="complete")
                 else:
-                    st.session_state.show_results = True
-                    st.session_state.result_data = {
-                        "success": False,
-                        "error": result.get('error', 'Unknown error'),
-                        "full_response": result,
-                        "payload": payload
-                    }
-                    st.session_state.is_generating = False
-                    st.rerun()
-            elif response.status_code == 422:
-                # Validation error
-                st.session_state.is_generating = False
-                try:
-                    error_detail = response.json()
-                    logger.error(f"Validation error (422): {error_detail}")
-                    st.error(f"⚠️ Validation Error: {error_detail.get('detail', 'Invalid parameters')}")
-                    if 'errors' in error_detail:
-                        st.json(error_detail['errors'])
-                except:
-                    st.error("⚠️ Validation Error: Invalid parameters provided")
-            else:
-                # Log full error details for debugging
-                st.session_state.is_generating = False
-                try:
-                    error_response = response.json()
-                    logger.error(f"API Error {response.status_code}:")
-                    logger.error(f"  Response: {error_response}")
-                    logger.error(f"  Payload sent: {payload}")
-                    error_msg = error_response.get('error', 'Unknown error')
-                except:
-                    logger.error(f"API Error {response.status_code}: Could not parse response")
-                    logger.error(f"  Response content: {response.content}")
-                    logger.error(f"  Payload sent: {payload}")
-                    error_msg = 'Unknown error'
-                
-                st.error(f"API Error ({response.status_code}): {error_msg}")
-                
-        except requests.exceptions.Timeout:
-            st.session_state.is_generating = False
-            logger.error("Request timed out")
-            st.error("⏱️ Request timed out. The model might be taking too long to generate.")
-        except requests.exceptions.ConnectionError as e:
-            st.session_state.is_generating = False
-            logger.error(f"Connection error: {str(e)}")
-            st.error("🔌 Could not connect to API. Make sure the Cloud Run service is deployed and the URL is correct.")
-        except Exception as e:
-            st.session_state.is_generating = False
-            logger.error(f"Unexpected error: {str(e)}", exc_info=True)
-            st.error(f"❌ Error: {str(e)}")
-
-# Display results if available
-if st.session_state.show_results and st.session_state.result_data:
-    result_data = st.session_state.result_data
-    
-    if result_data.get("success"):
-        st.success("✅ Generation complete! Text has been appended to the context above.")
+                    status.update(label="Generation failed", state="error")
+                    logger.error(f"Unexpected API response: {failed}")
+                    st.error(f"❌ Error: {failed.get('error', 'Unknown error')}")
+                    st.json(failed)
+            except requests.exceptions.HTTPError as e:
+                status.update(label="Generation failed", state="error")
+                logger.error(f"API Error {e.response.status_code}: {e.response.content}")
+                st.error(f"API Error ({e.response.status_code})")
+            except requests.exceptions.Timeout:
+                status.update(label="Generation failed", state="error")
+                logger.error("Request timed out")
+                st.error("⏱️ Request timed out. The model might be taking too long to generate.")
+            except requests.exceptions.ConnectionError as e:
+                status.update(label="Generation failed", state="error")
+                logger.error(f"Connection error: {str(e)}")
+                st.error("🔌 Could not connect to API. Make sure the Cloud Run service is deployed and the URL is correct.")
+            except Exception as e:
+                status.update(label="Generation failed", state="error")
+                logger.error(f"Unexpected error: {str(e)}", exc_info=True)
+                st.error(f"❌ Error: {str(e)}")
+
+    # Main interface - Generate button. Generation runs in this same pass inside
+    # st.status; the only rerun is at the end, to show the appended context.
+    elif generate_clicked:
+        current_context = st.session_state.context_text
         
-        # Display generation details
-        with st.expander("ℹ️ Generation Details"):
-            details = {}
-            if result_data.get("generation_time"):
-                details["Generation Time (seconds)"] = result_data["generation_time"]
-            if result_data.get("tokens"):
-                details["Number of Tokens"] = len(result_data["tokens"])
-                details["Tokens"] = result_data["tokens"]
-            if result_data.get("text"):
-                details["Generated Text Length"] = len(result_data["text"])
-            details["Request Parameters"] = result_data["payload"]
-            st.json(details)
-    else:
-        st.error(f"❌ Generation failed: {result_data.get('error', 'Unknown error')}")
+        # Clear previous results
+        st.session_state.show_results = False
+        st.session_state.result_data = None
+        st.session_state.variant_texts = None
         
-        # Display full response for debugging
-        with st.expander("🔍 Full Response Details"):
-            st.json(result_data.get("full_response", {}))
+        cold_hint = st.empty()
+        with st.status("Generating text...", expanded=True) as status:
+            try:
+                # Make API request
+                context_value = None
+                if current_context.strip():
+                    # Convert context to array of characters or tokens
+                    context_value = list(current_context.strip())
+                
+                payload = {
+                    "seed": int(seed),
+                    "temperature": float(temperature),
+                    "max_tokens": int(max_tokens),
+                    "context": context_value,
+                    "model": model,
+                    # Ask for an SSE token stream; servers without streaming
+                    # support ignore this and return the usual JSON body
+                    "stream": True
+                }
+                
+                # Log the request for debugging
+                logger.info(f"Making API request with model={model}, seed={seed}, temperature={temperature}, max_tokens={max_tokens}, context_length={len(context_value) if context_value else 0}")
+                
+                def post_generate():
+                    return get_session().post(
+                        f"{API_URL}/generate",
+                        json=payload,
+                        timeout=120,
+                        stream=True
+                    )
+
+                response = run_with_cold_start_hint(post_generate, cold_hint)
+                
+                if response.status_code == 200:
+                    result = read_generation(response, st.empty())
+                    
+                    # Check if response contains the expected "text" field
+                    if "text" in result:
+                        # Log successful generation
+                        text_preview = result["text"][:50] + "..." if len(result["text"]) > 50 else result["text"]
+                        logger.info(f"Successfully generated text (preview): {text_preview}")
+                        logger.info(f"Current context length: {len(current_context)}, API response length: {len(result['text'])}, max_tokens: {max_tokens}")
+                        
+                        # Extract only the last max_tokens characters (the newly generated portion)
+                        # The API returns context + generated text, so the last portion is new
+                        generated_only = result["text"][-max_tokens:] if len(result["text"]) >= max_tokens else result["text"]
+                        logger.info(f"Extracted last {len(generated_only)} characters as newly generated text")
+                        
+                        # Update context with the new generated text
+                        st.session_state.context_text = current_context + generated_only
+                        
+                        # Store results in session state for details display
+                        st.session_state.show_results = True
+                        st.session_state.result_data = {
+                            "text": generated_only,  # Store only the newly generated portion
+                            "generation_time": result.get("generation_time"),
+                            "tokens": result.get("tokens"),
+                            "payload": payload,
+                            "success": True
+                        }
+                        
+                        st.rerun(scope="fragment")
+                    else:
+                        st.session_state.show_results = True
+                        st.session_state.result_data = {
+                            "success": False,
+                            "error": result.get('error', 'Unknown error'),
+                            "full_response": result,
+                            "payload": payload
+                        }
+                        st.rerun(scope="fragment")
+                elif response.status_code == 422:
+                    # Validation error
+                    status.update(label="Generation failed", state="error")
+                    try:
+                        error_detail = response.json()
+                        logger.error(f"Validation error (422): {error_detail}")
+                        st.error(f"⚠️ Validation Error: {error_detail.get('detail', 'Invalid parameters')}")
+                        if 'errors' in error_detail:
+                            st.json(error_detail['errors'])
+                    except:
+                        st.error("⚠️ Validation Error: Invalid parameters provided")
+                else:
+                    # Log full error details for debugging
+                    status.update(label="Generation failed", state="error")
+                    try:
+                        error_response = response.json()
+                        logger.error(f"API Error {response.status_code}:")
+                        logger.error(f"  Response: {error_response}")
+                        logger.error(f"  Payload sent: {payload}")
+                        error_msg = error_response.get('error', 'Unknown error')
+                    except:
+                        logger.error(f"API Error {response.status_code}: Could not parse response")
+                        logger.error(f"  Response content: {response.content}")
+                        logger.error(f"  Payload sent: {payload}")
+                        error_msg = 'Unknown error'
+                    
+                    st.error(f"API Error ({response.status_code}): {error_msg}")
+                    
+            except requests.exceptions.Timeout:
+                status.update(label="Generation failed", state="error")
+                logger.error("Request timed out")
+                st.error("⏱️ Request timed out. The model might be taking too long to generate.")
+            except requests.exceptions.ConnectionError as e:
+                status.update(label="Generation failed", state="error")
+                logger.error(f"Connection error: {str(e)}")
+                st.error("🔌 Could not connect to API. Make sure the Cloud Run service is deployed and the URL is correct.")
+            except Exception as e:
+                status.update(label="Generation failed", state="error")
+                logger.error(f"Unexpected error: {str(e)}", exc_info=True)
+                st.error(f"❌ Error: {str(e)}")
+
+    # Display results if available
+    if st.session_state.show_results and st.session_state.result_data:
+        result_data = st.session_state.result_data
         
-        # Display request parameters that were sent
-        with st.expander("📤 Request Parameters Sent"):
-            st.json(result_data.get("payload", {}))
-
-# Vocabulary section
-st.markdown("---")
-st.markdown("### 📖 Model Vocabulary")
+        if result_data.get("success"):
+            st.success("✅ Generation complete! Text has been appended to the context above.")
+            
+            # Display generation details. The JSON is serialized on the first
+            # render and kept on result_data; st.json takes the string as-is, so
+            # later reruns skip re-encoding it.
+            if "details_json" not in result_data:
+                details = {}
+                if result_data.get("generation_time"):
+                    details["Generation Time (seconds)"] = result_data["generation_time"]
+                if result_data.get("tokens"):
+                    details["Number of Tokens"] = len(result_data["tokens"])
+                    details["Tokens"] = result_data["tokens"]
+                if result_data.get("text"):
+                    details["Generated Text Length"] = len(result_data["text"])
+                details["Request Parameters"] = result_data["payload"]
+                result_data["details_json"] = json.dumps(details, default=str)
+            with st.expander("ℹ️ Generation Details"):
+                st.json(result_data["details_json"])
+        else:
+            st.error(f"❌ Generation failed: {result_data.get('error', 'Unknown error')}")
+            
+            if "full_response_json" not in result_data:
+                result_data["full_response_json"] = json.dumps(result_data.get("full_response", {}), default=str)
+                result_data["payload_json"] = json.dumps(result_data.get("payload", {}), default=str)
+            
+            # Display full response for debugging
+            with st.expander("🔍 Full Response Details"):
+                st.json(result_data["full_response_json"])
+            
+            # Display request parameters that were sent
+            with st.expander("📤 Request Parameters Sent"):
+                st.json(result_data["payload_json"])
+
+    # Pick one of the parallel variants to append
+    if st.session_state.variant_texts:
+        st.markdown("#### 🔀 Variants")
+        variant_tabs = st.tabs([f"Variant {i + 1}" for i in range(len(st.session_state.variant_texts))])
+        for i, (tab, text) in enumerate(zip(variant_tabs, st.session_state.variant_texts)):
+            with tab:
+                st.text(text)
+                st.button(
+                    "➕ Append to Context",
+                    key=f"append_variant_{i}",
+                    on_click=append_variant,
+                    args=(text,)
+                )
 
-if st.button("🔤 Load Vocabulary", use_container_width=True):
-    cold_hint = st.empty()
-    with st.spinner("Loading vocabulary..."):
-        try:
-            def get_vocab():
-                return requests.get(f"{API_URL}/vocab/{model}", timeout=120)
 
-            response = run_with_cold_start_hint(get_vocab, cold_hint)
+@st.fragment
+def vocab_panel(model):
+    """Model vocabulary viewer."""
+    mark_active()
+    st.markdown("---")
+    st.markdown("### 📖 Model Vocabulary")
 
-            if response.status_code == 200:
-                vocab_data = response.json()
+    if st.button("🔤 Load Vocabulary", use_container_width=True):
+        cold_hint = st.empty()
+        with st.spinner("Loading vocabulary..."):
+            try:
+                vocab_data = run_with_cold_start_hint(lambda: load_vocab(model, API_URL), cold_hint)
                 st.success("✅ Vocabulary loaded!")
 
                 # Display vocabulary information
@@ -398,15 +667,19 @@ if st.button("🔤 Load Vocabulary", use_container_width=True):
                         st.json(vocab_data)
                 else:
                     st.json(vocab_data)
-            else:
-                st.error(f"Failed to load vocabulary: {response.status_code}")
-
-        except requests.exceptions.Timeout:
-            st.error("⏱️ Request timed out.")
-        except requests.exceptions.ConnectionError:
-            st.error("🔌 Could not connect to API.")
-        except Exception as e:
-            st.error(f"❌ Error: {str(e)}")
+
+            except requests.exceptions.HTTPError as e:
+                st.error(f"Failed to load vocabulary: {e.response.status_code}")
+            except requests.exceptions.Timeout:
+                st.error("⏱️ Request timed out.")
+            except requests.exceptions.ConnectionError:
+                st.error("🔌 Could not connect to API.")
+            except Exception as e:
+                st.error(f"❌ Error: {str(e)}")
+
+
+generate_panel(model)
+vocab_panel(model)
 
 # Information section
 st.markdown("---")
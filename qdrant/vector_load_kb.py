@@ -1,18 +1,40 @@
 import os
 from qdrant_client import QdrantClient
-from qdrant_client.models import VectorParams, Distance
-from qdrant_client.http.models import PointStruct
+from qdrant_client.models import (
+    VectorParams, Distance, ScalarQuantization, ScalarQuantizationConfig, ScalarType,
+    BinaryQuantization, BinaryQuantizationConfig,
+)
 from fastembed import TextEmbedding  # installed via qdrant-client[fastembed]
 import json
-from collections import defaultdict
+import numpy as np
+from collections import Counter
 
 QDRANT_API_KEY = os.getenv("QDRANT_API_KEY")
 QDRANT_URL = os.getenv("QDRANT_URL")
 COLLECTION_NAME = "knowledge_base"
+# "int8" stores a scalar-quantized copy of the vectors in RAM for faster search,
+# "binary" a 1-bit-per-dimension copy (32x smaller, coarser; needs more
+# oversampling). Pair with the same setting on the app so searches rescore.
+QDRANT_QUANTIZATION = os.getenv("QDRANT_QUANTIZATION", "").lower()
+# Texts per ONNX Runtime pass; 64 keeps CPU intra-op threads busy (raise on GPU builds)
+EMBED_BATCH_SIZE = 64
+# Points per upload request
+UPLOAD_BATCH_SIZE = 256
+# gRPC (HTTP/2 + protobuf) for the bulk upload, on unless QDRANT_PREFER_GRPC is
+# set to something else (e.g. 0 for a Qdrant that only exposes REST)
+QDRANT_PREFER_GRPC = os.getenv("QDRANT_PREFER_GRPC", "true").lower() in ("1", "true", "yes")
 
 print("Connecting to Qdrant...")
-client = QdrantClient(url=os.getenv("QDRANT_URL"), api_key=os.getenv("QDRANT_API_KEY"))
-embedder = TextEmbedding(model_name="BAAI/bge-small-en-v1.5")  # fast + good demo choice
+# Qdrant Cloud serves gRPC on 6334
+client = QdrantClient(
+    url=os.getenv("QDRANT_URL"),
+    api_key=os.getenv("QDRANT_API_KEY"),
+    prefer_grpc=QDRANT_PREFER_GRPC,
+    grpc_port=6334,
+    timeout=60,
+)
+# Pin ONNX Runtime's intra-op pool to every core; bulk embedding is matmul-bound
+embedder = TextEmbedding(model_name="BAAI/bge-small-en-v1.5", threads=os.cpu_count())  # fast + good demo choice
 
 # 0) Load chunks from JSON file
 chunks_path = os.path.join(os.path.dirname(__file__), "chunks.json")
@@ -31,82 +53,79 @@ print(f"Vector size: {VECTOR_SIZE}")
 
 # 2) Create collection
 print("Creating/recreating collection...")
+quantization_config = None
+if QDRANT_QUANTIZATION == "int8":
+    print("Enabling int8 scalar quantization")
+    quantization_config = ScalarQuantization(
+        scalar=ScalarQuantizationConfig(type=ScalarType.INT8, quantile=0.99, always_ram=True),
+    )
+elif QDRANT_QUANTIZATION == "binary":
+    print("Enabling binary quantization")
+    quantization_config = BinaryQuantization(
+        binary=BinaryQuantizationConfig(always_ram=True),
+    )
 client.recreate_collection(
     collection_name=COLLECTION_NAME,
     vectors_config=VectorParams(size=VECTOR_SIZE, distance=Distance.COSINE),
+    quantization_config=quantization_config,
 )
 
 # 3) Prepare texts for embedding (title + content)
 print("Generating embeddings...")
-texts = [c["title"] + " " + c["content"] for c in chunks]
-vectors_iter = embedder.embed(texts)
-
-# 4) Build points with full chunk as payload
-points = []
+# Embed each distinct text once: unique_texts maps text -> row in the embedded
+# matrix (insertion ordered), vector_rows maps each chunk to its row
+unique_texts = {}
+vector_rows = [unique_texts.setdefault(f"{c['title']} {c['content']}", len(unique_texts)) for c in chunks]
+if len(unique_texts) < len(chunks):
+    print(f"Skipping {len(chunks) - len(unique_texts)} duplicate text(s)")
+unique_vectors = np.vstack(list(embedder.embed(unique_texts.keys(), batch_size=EMBED_BATCH_SIZE))).astype(np.float32)
+vectors = unique_vectors[vector_rows]
+# Convert to Python floats in one C-level pass instead of per element per chunk
+vector_lists = vectors.tolist()
+
+# 4) Build payloads with the full chunk
+point_ids = []
+point_vectors = []
+payloads = []
 errors = []
-for idx, (c, v) in enumerate(zip(chunks, vectors_iter)):
+for idx, (c, v) in enumerate(zip(chunks, vector_lists)):
     try:
-        # Convert numpy array to list of floats
-        vector_list = [float(x) for x in v]
-        
         # Rename 'id' to 'chunk_id' in payload to avoid confusion
         payload = {**c}
         payload['chunk_id'] = payload.pop('id')
         
         # Use numeric index as Qdrant point ID (required by Qdrant)
-        points.append(
-            PointStruct(
-                id=idx,  # Use numeric index as point ID
-                vector=vector_list,
-                payload=payload,  # Store the entire chunk with chunk_id
-            ),
-        )
+        point_ids.append(idx)
+        point_vectors.append(v)
+        payloads.append(payload)  # Store the entire chunk with chunk_id
     except Exception as e:
         errors.append(f"Error processing chunk {c.get('id', idx)}: {e}")
 
-# 5) Upsert points to Qdrant
-print(f"Inserting {len(points)} points into Qdrant...")
-client.upsert(collection_name=COLLECTION_NAME, points=points)
+# 5) Upload points to Qdrant in batches
+print(f"Inserting {len(point_ids)} points into Qdrant...")
+client.upload_collection(
+    collection_name=COLLECTION_NAME,
+    vectors=point_vectors,
+    payload=payloads,
+    ids=point_ids,
+    batch_size=UPLOAD_BATCH_SIZE,
+)
 
 # 6) Aggregate metadata
 print("Aggregating metadata...")
-chunk_list = []
-audience_counts = defaultdict(int)
-doc_type_counts = defaultdict(int)
-category_counts = defaultdict(int)
-product_id_counts = defaultdict(int)
-tag_counts = defaultdict(int)
-
-for chunk in chunks:
-    # Create sorted list entry: chunk_id + title
-    chunk_list.append(f"{chunk['id']}: {chunk['title']}")
-    
-    # Count by audience
-    audience_counts[chunk['audience']] += 1
-    
-    # Count by doc_type
-    doc_type_counts[chunk['doc_type']] += 1
-    
-    # Count by category (handle null)
-    category = chunk.get('category')
-    if category is not None:
-        category_counts[category] += 1
-    else:
-        category_counts['null'] += 1
-    
-    # Count by product_id (handle null)
-    product_id = chunk.get('product_id')
-    if product_id is not None:
-        product_id_counts[product_id] += 1
-    else:
-        product_id_counts['null'] += 1
-    
-    # Count by tags
-    for tag in chunk.get('tags', []):
-        tag_counts[tag] += 1
-
-# Sort the chunk list
-chunk_list.sort()
+# Sorted list entries: chunk_id + title
+chunk_list = sorted(f"{chunk['id']}: {chunk['title']}" for chunk in chunks)
+
+audience_counts = Counter(chunk['audience'] for chunk in chunks)
+doc_type_counts = Counter(chunk['doc_type'] for chunk in chunks)
+# category / product_id may be null
+category_counts = Counter(
+    chunk['category'] if chunk.get('category') is not None else 'null' for chunk in chunks
+)
+product_id_counts = Counter(
+    chunk['product_id'] if chunk.get('product_id') is not None else 'null' for chunk in chunks
+)
+tag_counts = Counter(tag for chunk in chunks for tag in chunk.get('tags', []))
 
 # 7) Write metadata to file
 print("Writing metadata to chunk_metadata.txt...")
@@ -150,7 +169,7 @@ with open(metadata_path, "w", encoding="utf-8") as f:
 print("\n" + "=" * 80)
 print("SUMMARY")
 print("=" * 80)
-print(f"✓ Successfully inserted {len(points)} chunks into Qdrant collection '{COLLECTION_NAME}'")
+print(f"✓ Successfully inserted {len(point_ids)} chunks into Qdrant collection '{COLLECTION_NAME}'")
 
 if errors:
     print(f"\n⚠ Encountered {len(errors)} error(s):")
@@ -1,15 +1,86 @@
 """Qdrant vector store manager for knowledge base search."""
 import os
-from typing import List, Dict, Any, Optional
+import time
+import logging
+import hashlib
+import threading
+from collections import OrderedDict
+from operator import attrgetter
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Union
 from qdrant_client import QdrantClient
-from qdrant_client.models import Distance, VectorParams, PointStruct, Filter
-from openai import OpenAI
+from qdrant_client.models import (
+    Distance, VectorParams, PointStruct, Filter, QueryRequest,
+    SearchParams, QuantizationSearchParams,
+)
+import numpy as np
 from fastembed import TextEmbedding
 
 
+logger = logging.getLogger(__name__)
+
 QDRANT_API_KEY = os.getenv("QDRANT_API_KEY")
 QDRANT_URL = os.getenv("QDRANT_URL")
 COLLECTION_NAME = "knowledge_base"
+EMBEDDING_MODEL = "BAAI/bge-small-en-v1.5"
+# Max queries per query_batch_points call
+QUERY_BATCH_SIZE = 16
+# Query embeddings kept per VectorStore (LRU); repeat queries skip the model
+EMBED_CACHE_SIZE = 1024
+# Second, on-disk tier under that LRU so embeddings survive process restarts
+EMBED_CACHE_DIR = Path(os.getenv("EMBED_CACHE_DIR", "./.cache/embeddings"))
+# Search results are reused for a query whose embedding is at least this
+# cosine-similar to an earlier one with the same search options
+SEARCH_CACHE_THRESHOLD = 0.95
+SEARCH_CACHE_TTL_SECONDS = 600
+SEARCH_CACHE_SIZE = 512
+# QDRANT_PREFER_GRPC=1 talks to Qdrant over one long-lived gRPC (HTTP/2)
+# channel on port 6334 instead of REST; needs that port reachable
+QDRANT_PREFER_GRPC = os.getenv("QDRANT_PREFER_GRPC", "").lower() in ("1", "true", "yes")
+
+# Set QDRANT_QUANTIZATION to match how vector_load_kb.py built the collection:
+# search the quantized vectors with oversampling, then rescore the candidates
+# against the original vectors. Binary codes are coarser, so oversample more.
+QUANTIZATION_OVERSAMPLING = {"int8": 2.0, "binary": 3.0}
+_oversampling = QUANTIZATION_OVERSAMPLING.get(os.getenv("QDRANT_QUANTIZATION", "").lower())
+if _oversampling:
+    SEARCH_PARAMS = SearchParams(
+        quantization=QuantizationSearchParams(rescore=True, oversampling=_oversampling),
+    )
+else:
+    SEARCH_PARAMS = None
+
+_point_fields = attrgetter('id', 'score', 'payload')
+
+def _points_to_matches(points) -> List[Dict[str, Any]]:
+    """Convert Qdrant ScoredPoints to the {'id', 'score', 'payload'} dicts callers expect."""
+    return [
+        dict(zip(('id', 'score', 'payload'), _point_fields(point)))
+        for point in points
+    ]
+
+def _embed_cache_path(text: str) -> Path:
+    """Disk cache file for a text's embedding (keyed on model + text)."""
+    key = hashlib.sha256(f"{EMBEDDING_MODEL}\n{text}".encode("utf-8")).hexdigest()
+    return EMBED_CACHE_DIR / f"{key}.f32"
+
+def _read_disk_embedding(text: str) -> Optional[np.ndarray]:
+    """Return a cached float32 embedding from disk, or None."""
+    try:
+        return np.frombuffer(_embed_cache_path(text).read_bytes(), dtype=np.float32)
+    except OSError:
+        return None
+
+def _write_disk_embedding(text: str, vector) -> None:
+    """Write atomically (temp file + rename) so a crash never leaves a partial vector."""
+    path = _embed_cache_path(text)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+        tmp_path.write_bytes(np.asarray(vector, dtype=np.float32).tobytes())
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logger.warning("Could not write embedding cache file %s: %s", path, e)
 
 class VectorStore:
     """Manages Qdrant vector database for semantic search."""
@@ -26,9 +97,18 @@ class VectorStore:
         self.url = url or os.getenv("QDRANT_URL")
         self.api_key = api_key or os.getenv("QDRANT_API_KEY")
         self.collection_name = collection_name
+        # Guards the lazy embedder load; tool calls may search concurrently
+        self._embedder_lock = threading.Lock()
+        # text -> embedding, most recently used last
+        self._embed_cache: "OrderedDict[str, Any]" = OrderedDict()
+        self._embed_cache_lock = threading.Lock()
+        # key -> (unit query vector, created, (limit, score_threshold, payload_fields), results)
+        self._search_cache: "OrderedDict[int, Any]" = OrderedDict()
+        self._search_cache_key = 0
+        self._search_cache_lock = threading.Lock()
         
         if not self.url or not self.api_key:
-            print("Warning: Qdrant URL or API key not configured. Vector search won't work.")
+            logger.warning("Qdrant URL or API key not configured. Vector search won't work.")
             self.client = None
             self.embedder = None
         else:
@@ -36,12 +116,13 @@ class VectorStore:
                 self.client = QdrantClient(
                     url=self.url,
                     api_key=self.api_key,
+                    prefer_grpc=QDRANT_PREFER_GRPC,
                 )
                 self._verify_collection()
                 # Lazy load embedder - only initialize when first search happens
                 self.embedder = None
-            except Exception as e:
-                print(f"Error connecting to Qdrant: {e}")
+            except Exception:
+                logger.exception("Error connecting to Qdrant")
                 self.client = None
                 self.embedder = None
 
@@ -57,24 +138,76 @@ class VectorStore:
         if not self.client:
             return
         try:
-            collections = self.client.get_collections()
-            collection_names = [col.name for col in collections.collections]
-            if self.collection_name not in collection_names:
-                print(
-                    f"Warning: Qdrant collection '{self.collection_name}' does not exist. "
-                    f"Run `python -m qdrant.vector_load_kb` to create and populate it."
+            if not self.client.collection_exists(self.collection_name):
+                logger.warning(
+                    "Qdrant collection '%s' does not exist. "
+                    "Run `python -m qdrant.vector_load_kb` to create and populate it.",
+                    self.collection_name,
                 )
-        except Exception as e:
-            print(f"Error verifying Qdrant collection: {e}")
+        except Exception:
+            logger.exception("Error verifying Qdrant collection")
+    
+    def _cached_search(self, unit_vector: np.ndarray,
+                       search_key: tuple) -> Optional[List[Dict[str, Any]]]:
+        """Return cached results for a near-duplicate query with the same search_key, or None."""
+        now = time.monotonic()
+        with self._search_cache_lock:
+            expired = [key for key, (_, created, _, _) in self._search_cache.items()
+                       if now - created > SEARCH_CACHE_TTL_SECONDS]
+            for key in expired:
+                del self._search_cache[key]
+            
+            keys = [key for key, (_, _, params, _) in self._search_cache.items()
+                    if params == search_key]
+            if not keys:
+                return None
+            
+            scores = np.stack([self._search_cache[key][0] for key in keys]) @ unit_vector
+            best = int(np.argmax(scores))
+            if scores[best] < SEARCH_CACHE_THRESHOLD:
+                return None
+            
+            self._search_cache.move_to_end(keys[best])
+            return list(self._search_cache[keys[best]][3])
+    
+    def _cache_search(self, unit_vector: np.ndarray, search_key: tuple,
+                      results: List[Dict[str, Any]]):
+        """Remember a query's results for later near-duplicate queries."""
+        with self._search_cache_lock:
+            self._search_cache[self._search_cache_key] = (
+                unit_vector, time.monotonic(), search_key, results,
+            )
+            self._search_cache_key += 1
+            while len(self._search_cache) > SEARCH_CACHE_SIZE:
+                self._search_cache.popitem(last=False)
     
-    def search(self, query_vector: List[float], limit: int = 5, 
-               score_threshold: float = 0.7) -> List[Dict[str, Any]]:
+    @staticmethod
+    def _search_key(limit: int, score_threshold: float,
+                    payload_fields: Optional[List[str]]) -> tuple:
+        """Search options a cached result is only valid for."""
+        return (limit, score_threshold, tuple(payload_fields) if payload_fields else None)
+    
+    @staticmethod
+    def _unit(vector) -> np.ndarray:
+        """L2-normalize a vector so cache lookups are a plain dot product."""
+        vector = np.asarray(vector, dtype=np.float32)
+        return vector / (np.linalg.norm(vector) + 1e-12)
+    
+    def search(self, query_vector: Union[np.ndarray, List[float]], limit: int = 5, 
+               score_threshold: float = 0.7,
+               payload_fields: Optional[List[str]] = None) -> List[Dict[str, Any]]:
         """Search for similar documents using vector similarity.
         
+        Near-duplicate queries (see SEARCH_CACHE_THRESHOLD) are answered from
+        an in-memory cache without a Qdrant round trip.
+        
         Args:
-            query_vector: Query embedding vector (1536 dimensions for OpenAI)
+            query_vector: Query embedding vector (384 dimensions, BAAI/bge-small-en-v1.5);
+                pass the embedder's float32 array as-is, qdrant-client converts it
             limit: Maximum number of results to return
             score_threshold: Minimum similarity score (0-1)
+            payload_fields: Payload keys to return (default: the whole payload);
+                list only what the caller reads to shrink the response
             
         Returns:
             List of matching documents with scores
@@ -82,58 +215,192 @@ class VectorStore:
         if not self.client:
             raise Exception("Qdrant client not initialized. Cannot search by vector.")
         
+        unit_vector = self._unit(query_vector)
+        search_key = self._search_key(limit, score_threshold, payload_fields)
+        cached = self._cached_search(unit_vector, search_key)
+        if cached is not None:
+            return cached
+        
         try:
             results = self.client.query_points(
                 collection_name=self.collection_name,
                 query=query_vector,
                 limit=limit,
                 score_threshold=score_threshold,
+                search_params=SEARCH_PARAMS,
+                with_payload=payload_fields or True,
             )
             
-            return [
-                {
-                    'id': point.id,
-                    'score': point.score,
-                    'payload': point.payload,
-                }
-                for point in results.points
-            ]
+            matches = _points_to_matches(results.points)
+            self._cache_search(unit_vector, search_key, matches)
+            return list(matches)
         except Exception as e:
-            print(f"Error searching Qdrant: {e}")
-            raise Exception(f"Error searching Qdrant: {e}")
+            logger.exception("Error searching Qdrant")
+            raise Exception(f"Error searching Qdrant: {e}") from e
+    
+    def _get_embedder(self) -> TextEmbedding:
+        """Return the embedder, loading it on first use (saves ~130MB of memory at startup)."""
+        with self._embedder_lock:
+            if self.embedder is None:
+                logger.info("Lazy loading FastEmbed model (first search)...")
+                self.embedder = TextEmbedding(model_name=EMBEDDING_MODEL)
+        return self.embedder
+    
+    def warm_up(self):
+        """Load the embedder and run one forward pass, bypassing the embedding caches.
+        
+        Moves the model load and ONNX Runtime's first-call session and
+        allocator setup off the first real search. A cached "warmup" text
+        would skip the model entirely, hence the direct call.
+        """
+        list(self._get_embedder().embed(["warmup"]))
+    
+    def embed_text(self, text: str):
+        """Embed a single text with the same model used for knowledge base search.
+        
+        Repeat texts are served from an in-memory LRU of EMBED_CACHE_SIZE entries.
+        
+        Args:
+            text: Text to embed
+            
+        Returns:
+            Embedding vector (numpy array, 384 dimensions)
+        """
+        return self.embed_texts([text])[0]
+    
+    def embed_texts(self, texts: List[str]) -> List[Any]:
+        """Embed several texts in one FastEmbed pass.
+        
+        Texts already in the embedding cache (in memory, then on disk under
+        EMBED_CACHE_DIR) are not re-embedded; the rest go through the model
+        together and are added to both tiers.
+        
+        Args:
+            texts: Texts to embed
+            
+        Returns:
+            Embedding vectors (numpy arrays, 384 dimensions), in input order
+        """
+        vectors = {}
+        with self._embed_cache_lock:
+            for text in texts:
+                if text in self._embed_cache:
+                    self._embed_cache.move_to_end(text)
+                    vectors[text] = self._embed_cache[text]
+        
+        misses = [text for text in dict.fromkeys(texts) if text not in vectors]
+        loaded = {}
+        for text in misses:
+            vector = _read_disk_embedding(text)
+            if vector is not None:
+                loaded[text] = vector
+        
+        to_embed = [text for text in misses if text not in loaded]
+        if to_embed:
+            for text, vector in zip(to_embed, self._get_embedder().embed(to_embed)):
+                loaded[text] = vector
+                _write_disk_embedding(text, vector)
+        
+        if loaded:
+            vectors.update(loaded)
+            with self._embed_cache_lock:
+                self._embed_cache.update(loaded)
+                while len(self._embed_cache) > EMBED_CACHE_SIZE:
+                    self._embed_cache.popitem(last=False)
+        
+        return [vectors[text] for text in texts]
     
     def search_by_text(self, query_text: str, limit: int = 5, 
-                       score_threshold: float = 0.7) -> List[Dict[str, Any]]:
+                       score_threshold: float = 0.7,
+                       payload_fields: Optional[List[str]] = None,
+                       semantic_cache: bool = True) -> List[Dict[str, Any]]:
         """Search for similar documents using text query.
         
         Generates embeddings for the query text and performs vector similarity search.
+        Delegates to ``search_batch_by_text`` so single and batched lookups share
+        one embedding, caching and query path.
         
         Args:
             query_text: Text query
             limit: Maximum number of results
             score_threshold: Minimum similarity score (0-1)
+            payload_fields: Payload keys to return (default: the whole payload)
+            semantic_cache: Reuse results of near-duplicate earlier queries
             
         Returns:
             List of matching documents
         """
+        return self.search_batch_by_text(
+            [query_text], limit, score_threshold, payload_fields, semantic_cache
+        )[0]
+    
+    def search_batch_by_text(self, query_texts: List[str], limit: int = 5,
+                             score_threshold: float = 0.7,
+                             payload_fields: Optional[List[str]] = None,
+                             semantic_cache: bool = True) -> List[List[Dict[str, Any]]]:
+        """Search for several text queries with one embedding pass and batched Qdrant requests.
+        
+        Queries are sent through ``query_batch_points`` in groups of
+        QUERY_BATCH_SIZE, so N lookups cost one round trip per group
+        instead of one each. Near-duplicates of earlier queries are answered
+        from the search cache and not sent at all, unless semantic_cache is off.
+        
+        Args:
+            query_texts: Text queries
+            limit: Maximum number of results per query
+            score_threshold: Minimum similarity score (0-1)
+            payload_fields: Payload keys to return (default: the whole payload)
+            semantic_cache: Reuse (and store) results for near-duplicate queries;
+                turn off for keyed lookups such as "agent-sop-<tool>", whose
+                queries differ by one token and must not stand in for each other
+            
+        Returns:
+            One list of matching documents per query, in input order
+        """
         if not self.client:
             raise Exception("Qdrant client not initialized. Cannot search by text.")
         
+        if not query_texts:
+            return []
+        
         try:
-            # Lazy load embedder on first search (saves ~130MB of memory at startup)
-            if self.embedder is None:
-                print("Lazy loading FastEmbed model (first search)...")
-                self.embedder = TextEmbedding(model_name="BAAI/bge-small-en-v1.5")
+            unit_vectors = [self._unit(vector) for vector in self.embed_texts(query_texts)]
+            search_key = self._search_key(limit, score_threshold, payload_fields)
+            
+            if semantic_cache:
+                all_results = [self._cached_search(unit_vector, search_key)
+                               for unit_vector in unit_vectors]
+            else:
+                all_results = [None] * len(unit_vectors)
+            misses = [i for i, results in enumerate(all_results) if results is None]
             
-            # Generate embeddings for the query text
-            query_vector = next(self.embedder.embed([query_text]))
+            for start in range(0, len(misses), QUERY_BATCH_SIZE):
+                batch = misses[start:start + QUERY_BATCH_SIZE]
+                requests = [
+                    QueryRequest(
+                        query=unit_vectors[i].tolist(),
+                        limit=limit,
+                        score_threshold=score_threshold,
+                        params=SEARCH_PARAMS,
+                        with_payload=payload_fields or True,
+                    )
+                    for i in batch
+                ]
+                responses = self.client.query_batch_points(
+                    collection_name=self.collection_name,
+                    requests=requests,
+                )
+                for i, response in zip(batch, responses):
+                    matches = _points_to_matches(response.points)
+                    if semantic_cache:
+                        self._cache_search(unit_vectors[i], search_key, matches)
+                    all_results[i] = list(matches)
             
-            # Perform vector search
-            return self.search(query_vector, limit, score_threshold)
+            return all_results
             
         except Exception as e:
-            print(f"Error generating embeddings or searching: {e}")
-            raise Exception(f"Error generating embeddings or searching: {e}")    
+            logger.exception("Error generating embeddings or batch searching")
+            raise Exception(f"Error generating embeddings or batch searching: {e}") from e
     
     def get_collection_info(self) -> Dict[str, Any]:
         """Get information about the collection.
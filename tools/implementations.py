@@ -1,17 +1,104 @@
 """Tool implementations for customer support chatbot."""
 import json
+import time
 import logging
+import threading
+from collections import OrderedDict
 from typing import Dict, Any, List, Optional
 from database.db_manager import DatabaseManager
 from qdrant.vector_store import VectorStore
+from tools.schemas import TOOL_NAMES
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Knowledge base payload keys read by _format_kb_results
+KB_PAYLOAD_FIELDS = ["title", "content", "category", "url"]
+
+# Product reads (catalog searches, draft_order lookups) are served from memory
+# for this long; create_order and initiate_return clear them. check_inventory
+# always reads the database so stock is never stale there.
+PRODUCT_CACHE_TTL_SECONDS = 60
+PRODUCT_CACHE_SIZE = 512
+# Carrier rate cards change rarely; estimates are cached per (ZIP, weight)
+SHIPPING_CACHE_TTL_SECONDS = 60 * 60
+SHIPPING_CACHE_SIZE = 1024
+
+# Plural category names that dropping a trailing 's' would get wrong
+# (product categories are stored singular, e.g. 'accessory')
+IRREGULAR_CATEGORY_PLURALS = {
+    'accessories': 'accessory',
+    'batteries': 'battery',
+}
+
+
+class _TTLCache:
+    """Small thread-safe LRU with per-entry expiry (tool calls run concurrently)."""
+    
+    def __init__(self, maxsize: int, ttl_seconds: float):
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Any, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: Any) -> Optional[Any]:
+        """Return the cached value for ``key``, or None if missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            created, value = entry
+            if time.monotonic() - created > self.ttl_seconds:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+    
+    def set(self, key: Any, value: Any):
+        """Cache ``value`` under ``key``, evicting the least recently used entry if full."""
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+    
+    def clear(self):
+        """Drop every entry."""
+        with self._lock:
+            self._entries.clear()
+
 
 class ToolImplementations:
     """Implementations of all customer support tools."""
     
+    # Tool names execute_tool dispatches to the method of the same name
+    # (every tool in TOOL_SCHEMAS has one)
+    _TOOL_NAMES = TOOL_NAMES
+    
+    # Human-readable names for draft_order's missing fields
+    _FIELD_NAMES = {
+        "customer_name": "customer's full name",
+        "customer_email": "customer's email address",
+        "customer_phone": "customer's phone number",
+        "street_address": "street address",
+        "city": "city",
+        "state": "state",
+        "zip_code": "ZIP code",
+        "product_ids": "products to order",
+        "quantities": "quantities for products"
+    }
+    
+    # Customer/address fields draft_order requires, in reporting order
+    _CUSTOMER_FIELDS = (
+        "customer_name",
+        "customer_email",
+        "customer_phone",
+        "street_address",
+        "city",
+        "state",
+        "zip_code",
+    )
+    
     def __init__(self, db_manager: Optional[DatabaseManager] = None, 
                  vector_store: Optional[VectorStore] = None):
         """Initialize tool implementations.
@@ -22,6 +109,41 @@ class ToolImplementations:
         """
         self.db = db_manager or DatabaseManager()
         self.vector_store = vector_store or VectorStore()
+        # product_id -> product row, and normalized catalog filters -> product list
+        self._product_cache = _TTLCache(PRODUCT_CACHE_SIZE, PRODUCT_CACHE_TTL_SECONDS)
+        self._catalog_cache = _TTLCache(PRODUCT_CACHE_SIZE, PRODUCT_CACHE_TTL_SECONDS)
+        # (destination_zip, weight) -> shipping estimates
+        self._shipping_cache = _TTLCache(SHIPPING_CACHE_SIZE, SHIPPING_CACHE_TTL_SECONDS)
+    
+    def _get_products(self, product_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+        """Look up products by ID through the product cache; misses share one query.
+        
+        Args:
+            product_ids: Product IDs (numeric strings from the model's JSON are accepted)
+            
+        Returns:
+            Dictionary mapping int product ID to product dictionary (unknown IDs are absent)
+        """
+        products = {}
+        misses = []
+        for product_id in dict.fromkeys(int(product_id) for product_id in product_ids):
+            product = self._product_cache.get(product_id)
+            if product is None:
+                misses.append(product_id)
+            else:
+                products[product_id] = product
+        
+        if misses:
+            for product_id, product in self.db.get_products_by_ids(misses).items():
+                self._product_cache.set(product_id, product)
+                products[product_id] = product
+        
+        return products
+    
+    def _invalidate_product_caches(self):
+        """Forget cached product rows and catalog results after stock changes."""
+        self._product_cache.clear()
+        self._catalog_cache.clear()
     
     def draft_order(self, customer_name: Optional[str] = None, customer_email: Optional[str] = None,
                    customer_phone: Optional[str] = None, street_address: Optional[str] = None,
@@ -49,44 +171,14 @@ class ToolImplementations:
             missing_fields = []
             provided_fields = {}
             
-            # Check customer name
-            if not customer_name:
-                missing_fields.append("customer_name")
-            else:
-                provided_fields["customer_name"] = customer_name
-            
-            # Check customer email
-            if not customer_email:
-                missing_fields.append("customer_email")
-            else:
-                provided_fields["customer_email"] = customer_email
-            
-            # Check customer phone
-            if not customer_phone:
-                missing_fields.append("customer_phone")
-            else:
-                provided_fields["customer_phone"] = customer_phone
-            
-            # Check address fields individually
-            if not street_address:
-                missing_fields.append("street_address")
-            else:
-                provided_fields["street_address"] = street_address
-            
-            if not city:
-                missing_fields.append("city")
-            else:
-                provided_fields["city"] = city
-            
-            if not state:
-                missing_fields.append("state")
-            else:
-                provided_fields["state"] = state
-            
-            if not zip_code:
-                missing_fields.append("zip_code")
-            else:
-                provided_fields["zip_code"] = zip_code
+            # Check customer and address fields
+            customer_values = (customer_name, customer_email, customer_phone,
+                               street_address, city, state, zip_code)
+            for field, value in zip(self._CUSTOMER_FIELDS, customer_values):
+                if value:
+                    provided_fields[field] = value
+                else:
+                    missing_fields.append(field)
             
             # Check product IDs and quantities
             if not product_ids or len(product_ids) == 0:
@@ -107,8 +199,11 @@ class ToolImplementations:
                 total_cost = 0
                 total_weight = 0
                 
+                # One query (at most) for the whole cart instead of one per product
+                products = self._get_products(product_ids)
+                
                 for product_id, quantity in zip(product_ids, quantities):
-                    product = self.db.get_product_by_id(product_id)
+                    product = products.get(int(product_id))
                     if not product:
                         return {
                             "success": False,
@@ -159,19 +254,7 @@ class ToolImplementations:
                 }
             else:
                 # Build helpful message about what's missing
-                field_names = {
-                    "customer_name": "customer's full name",
-                    "customer_email": "customer's email address",
-                    "customer_phone": "customer's phone number",
-                    "street_address": "street address",
-                    "city": "city",
-                    "state": "state",
-                    "zip_code": "ZIP code",
-                    "product_ids": "products to order",
-                    "quantities": "quantities for products"
-                }
-                
-                missing_descriptions = [field_names.get(f, f) for f in missing_fields]
+                missing_descriptions = [self._FIELD_NAMES.get(f, f) for f in missing_fields]
                 
                 return {
                     "success": True,
@@ -229,6 +312,9 @@ class ToolImplementations:
                 quantities=quantities
             )
             
+            # Stock just changed for the ordered products
+            self._invalidate_product_caches()
+            
             # Get created order details
             order = self.db.get_order(order_id)
             
@@ -295,7 +381,9 @@ class ToolImplementations:
             if category:
                 category = category.lower().strip()
                 # Convert plural to singular
-                if category.endswith('s') and category not in ['accessories']:
+                if category in IRREGULAR_CATEGORY_PLURALS:
+                    category = IRREGULAR_CATEGORY_PLURALS[category]
+                elif category.endswith('s'):
                     category = category[:-1]  # Remove trailing 's'
 
             # Validate price_operator when price is provided
@@ -303,12 +391,16 @@ class ToolImplementations:
             if price is not None and price_operator not in valid_operators:
                 price_operator = "eq"
 
-            products = self.db.search_product_catalog(
-                category=category,
-                search_query=search_query,
-                price=price,
-                price_operator=price_operator
-            )
+            cache_key = (category, search_query, price, price_operator)
+            products = self._catalog_cache.get(cache_key)
+            if products is None:
+                products = self.db.search_product_catalog(
+                    category=category,
+                    search_query=search_query,
+                    price=price,
+                    price_operator=price_operator
+                )
+                self._catalog_cache.set(cache_key, products)
 
             return {
                 "success": True,
@@ -332,6 +424,7 @@ class ToolImplementations:
             Result dictionary with inventory info
         """
         try:
+            # Straight from the DB: stock can change outside this process
             product = self.db.get_product_by_id(product_id)
             
             if not product:
@@ -369,7 +462,12 @@ class ToolImplementations:
             Result dictionary with all shipping estimates
         """
         try:
-            estimates = self.db.estimate_shipping(destination_zip=destination_zip, weight_lbs=weight)
+            cache_key = (destination_zip.strip(), weight)
+            estimates = self._shipping_cache.get(cache_key)
+            if estimates is None:
+                estimates = self.db.estimate_shipping(destination_zip=destination_zip, weight_lbs=weight)
+                if estimates:
+                    self._shipping_cache.set(cache_key, estimates)
             
             if not estimates:
                 return {
@@ -447,8 +545,8 @@ class ToolImplementations:
             Result dictionary with return details
         """
         try:
-            # Check if order exists
-            order = self.db.get_order(order_id)
+            # Check if order exists (items and product names come back in the same query)
+            order = self.db.get_order_with_items(order_id)
             if not order:
                 return {
                     "success": False,
@@ -463,21 +561,33 @@ class ToolImplementations:
                         "error": "Number of products and quantities must match"
                     }
                 
+                # Requested quantity per product (a repeated product counts once, summed)
+                requested = {}
+                for product_id, quantity in zip(product_ids, quantities):
+                    requested[product_id] = requested.get(product_id, 0) + quantity
+                
                 # Verify products exist in the order
                 order_product_map = {item['product_id']: item for item in order.get('items', [])}
-                for product_id, quantity in zip(product_ids, quantities):
-                    if product_id not in order_product_map:
-                        return {
-                            "success": False,
-                            "error": f"Product ID {product_id} was not in order #{order_id}"
-                        }
-                    
-                    order_item = order_product_map[product_id]
-                    if quantity > order_item['quantity']:
-                        return {
-                            "success": False,
-                            "error": f"Cannot return {quantity} units of {order_item['product_name']}. Order only contained {order_item['quantity']} units."
-                        }
+                unknown = requested.keys() - order_product_map.keys()
+                if unknown:
+                    unknown_text = ", ".join(str(product_id) for product_id in sorted(unknown))
+                    return {
+                        "success": False,
+                        "error": f"Product ID(s) {unknown_text} were not in order #{order_id}"
+                    }
+                
+                # Report every over-quantity item at once
+                overs = [
+                    f"Cannot return {quantity} units of {order_product_map[product_id]['product_name']}. "
+                    f"Order only contained {order_product_map[product_id]['quantity']} units."
+                    for product_id, quantity in requested.items()
+                    if quantity > order_product_map[product_id]['quantity']
+                ]
+                if overs:
+                    return {
+                        "success": False,
+                        "error": " ".join(overs)
+                    }
             elif product_ids or quantities:
                 # One provided but not the other
                 return {
@@ -486,32 +596,28 @@ class ToolImplementations:
                 }
             
             # Create return
-            return_id = self.db.create_return(
+            return_info = self.db.create_return(
                 order_id=order_id,
                 return_reason=return_reason,
                 product_ids=product_ids,
                 quantities=quantities
             )
+            return_id = return_info['return_id']
             
-            return_info = self.db.get_return(return_id)
+            # Returned items may go back into stock
+            self._invalidate_product_caches()
             
-            # Build a descriptive message
+            # Build a descriptive message from the created return items
+            items_text = ", ".join(
+                f"{item['quantity']}x Product {item['product_id']}"
+                for item in return_info.get('items', [])
+            )
             if product_ids:
-                # Get product info for the message using return_info items
-                returned_items = [
-                    f"{item['quantity']}x Product {item['product_id']}"
-                    for item in return_info.get('items', [])
-                ]
-                items_text = ", ".join(returned_items)
-                message = f"Return request #{return_id} created for {items_text} from order #{order_id}. Refund amount: ${return_info['refund_total_amount']}"
+                scope = f"{items_text} from order #{order_id}"
             else:
                 # Full order return — all items included
-                returned_items = [
-                    f"{item['quantity']}x Product {item['product_id']}"
-                    for item in return_info.get('items', [])
-                ]
-                items_text = ", ".join(returned_items)
-                message = f"Return request #{return_id} created for entire order #{order_id} ({items_text}). Refund amount: ${return_info['refund_total_amount']}"
+                scope = f"entire order #{order_id} ({items_text})"
+            message = f"Return request #{return_id} created for {scope}. Refund amount: ${return_info['refund_total_amount']}"
             
             logger.info(f"initiate_return: {message}")
             
@@ -530,6 +636,38 @@ class ToolImplementations:
                 "error": str(e)
             }
     
+    def _format_kb_results(self, query: str, results: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Format vector store hits as a search_knowledge_base result.
+        
+        Args:
+            query: Search query
+            results: Matching documents from the vector store
+            
+        Returns:
+            Result dictionary with search results
+        """
+        # Format results for display
+        articles = []
+        for result in results:
+            payload = result.get('payload', {})
+            articles.append({
+                'title': payload.get('title', 'Untitled'),
+                'content': payload.get('content', ''),
+                'category': payload.get('category', ''),
+                'relevance_score': result.get('score', 0),
+                'url': payload.get('url', '')
+            })
+        
+        logger.info(f"Formatted {len(articles)} articles for display")
+        
+        return {
+            "success": True,
+            "query": query,
+            "count": len(articles),
+            "articles": articles,
+            "message": f"Found {len(articles)} relevant article(s)"
+        }
+    
     def search_knowledge_base(self, query: str) -> Dict[str, Any]:
         """Search the knowledge base.
         
@@ -541,30 +679,9 @@ class ToolImplementations:
         """
         try:
             logger.info(f"Searching knowledge base with query: '{query}'")
-            results = self.vector_store.search_by_text(query, limit=5)
+            results = self.vector_store.search_by_text(query, limit=5, payload_fields=KB_PAYLOAD_FIELDS)
             logger.info(f"Knowledge base returned {len(results)} results")
-            
-            # Format results for display
-            articles = []
-            for result in results:
-                payload = result.get('payload', {})
-                articles.append({
-                    'title': payload.get('title', 'Untitled'),
-                    'content': payload.get('content', ''),
-                    'category': payload.get('category', ''),
-                    'relevance_score': result.get('score', 0),
-                    'url': payload.get('url', '')
-                })
-            
-            logger.info(f"Formatted {len(articles)} articles for display")
-            
-            return {
-                "success": True,
-                "query": query,
-                "count": len(articles),
-                "articles": articles,
-                "message": f"Found {len(articles)} relevant article(s)"
-            }
+            return self._format_kb_results(query, results)
         except Exception as e:
             logger.error(f"Error searching knowledge base: {str(e)}", exc_info=True)
             return {
@@ -572,6 +689,34 @@ class ToolImplementations:
                 "error": str(e)
             }
     
+    def search_knowledge_base_batch(self, queries: List[str]) -> List[Dict[str, Any]]:
+        """Search the knowledge base for several queries in one batched lookup.
+        
+        Args:
+            queries: Search queries
+            
+        Returns:
+            One search_knowledge_base result dictionary per query, in input order
+        """
+        try:
+            logger.info(f"Batch searching knowledge base with {len(queries)} queries")
+            batch_results = self.vector_store.search_batch_by_text(
+                queries, limit=5, payload_fields=KB_PAYLOAD_FIELDS
+            )
+            return [
+                self._format_kb_results(query, results)
+                for query, results in zip(queries, batch_results)
+            ]
+        except Exception as e:
+            logger.error(f"Error batch searching knowledge base: {str(e)}", exc_info=True)
+            return [
+                {
+                    "success": False,
+                    "error": str(e)
+                }
+                for _ in queries
+            ]
+    
     def execute_tool(self, tool_name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
         """Execute a tool by name with arguments.
         
@@ -583,22 +728,11 @@ class ToolImplementations:
             Tool execution result
         """
         logger.info(f"Executing tool: {tool_name}")
-        logger.debug(f"Tool arguments: {json.dumps(arguments, indent=2)}")
-        
-        # Map tool names to methods
-        tool_map = {
-            "draft_order": self.draft_order,
-            "create_order": self.create_order,
-            "order_status": self.order_status,
-            "product_catalog": self.product_catalog,
-            "check_inventory": self.check_inventory,
-            "estimate_shipping": self.estimate_shipping,
-            "create_support_ticket": self.create_support_ticket,
-            "initiate_return": self.initiate_return,
-            "search_knowledge_base": self.search_knowledge_base,
-        }
+        # Only serialize the arguments when debug output is actually emitted
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Tool arguments: {json.dumps(arguments, indent=2)}")
         
-        if tool_name not in tool_map:
+        if tool_name not in self._TOOL_NAMES:
             logger.error(f"Unknown tool requested: {tool_name}")
             return {
                 "success": False,
@@ -606,7 +740,7 @@ class ToolImplementations:
             }
         
         try:
-            tool_func = tool_map[tool_name]
+            tool_func = getattr(self, tool_name)
             result = tool_func(**arguments)
             logger.info(f"Tool {tool_name} completed with success={result.get('success', False)}")
             return result
@@ -1,4 +1,55 @@
 """OpenAI function schemas for customer support tools."""
+from types import MappingProxyType
+from typing import Mapping
+
+# Customer, address and product-line fields shared by draft_order and create_order
+_ORDER_FIELDS = {
+    "customer_name": {
+        "type": "string",
+        "description": "Full name of the customer"
+    },
+    "customer_email": {
+        "type": "string",
+        "description": "Email address of the customer"
+    },
+    "customer_phone": {
+        "type": "string",
+        "description": "Phone number of the customer"
+    },
+    "street_address": {
+        "type": "string",
+        "description": "Street address including house/building number and street name"
+    },
+    "city": {
+        "type": "string",
+        "description": "City name"
+    },
+    "state": {
+        "type": "string",
+        "description": "State name or abbreviation"
+    },
+    "zip_code": {
+        "type": "string",
+        "description": "ZIP or postal code"
+    },
+    "product_ids": {
+        "type": "array",
+        "items": {"type": "integer"},
+        "description": "List of product IDs to order"
+    },
+    "quantities": {
+        "type": "array",
+        "items": {"type": "integer"},
+        "description": "List of quantities for each product (must match length of product_ids)"
+    }
+}
+
+# draft_order takes the same fields, each optional
+_DRAFT_ORDER_FIELDS = {
+    name: {**field, "description": f"{field['description']} (if provided)"}
+    for name, field in _ORDER_FIELDS.items()
+}
+_DRAFT_ORDER_FIELDS["quantities"]["description"] = "List of quantities for each product (if provided)"
 
 # Tool schemas for OpenAI function calling
 TOOL_SCHEMAS = [
@@ -9,46 +60,7 @@ TOOL_SCHEMAS = [
             "description": "Draft an order and validate all required information before creating it. Use this FIRST before create_order to check what information is needed from the customer.",
             "parameters": {
                 "type": "object",
-                "properties": {
-                    "customer_name": {
-                        "type": "string",
-                        "description": "Full name of the customer (if provided)"
-                    },
-                    "customer_email": {
-                        "type": "string",
-                        "description": "Email address of the customer (if provided)"
-                    },
-                    "customer_phone": {
-                        "type": "string",
-                        "description": "Phone number of the customer (if provided)"
-                    },
-                    "street_address": {
-                        "type": "string",
-                        "description": "Street address including house/building number and street name (if provided)"
-                    },
-                    "city": {
-                        "type": "string",
-                        "description": "City name (if provided)"
-                    },
-                    "state": {
-                        "type": "string",
-                        "description": "State name or abbreviation (if provided)"
-                    },
-                    "zip_code": {
-                        "type": "string",
-                        "description": "ZIP or postal code (if provided)"
-                    },
-                    "product_ids": {
-                        "type": "array",
-                        "items": {"type": "integer"},
-                        "description": "List of product IDs to order (if provided)"
-                    },
-                    "quantities": {
-                        "type": "array",
-                        "items": {"type": "integer"},
-                        "description": "List of quantities for each product (if provided)"
-                    }
-                },
+                "properties": _DRAFT_ORDER_FIELDS,
                 "required": []
             }
         }
@@ -60,46 +72,7 @@ TOOL_SCHEMAS = [
             "description": "Create a new customer order with products and shipping information. ONLY use this after draft_order confirms all information is complete.",
             "parameters": {
                 "type": "object",
-                "properties": {
-                    "customer_name": {
-                        "type": "string",
-                        "description": "Full name of the customer"
-                    },
-                    "customer_email": {
-                        "type": "string",
-                        "description": "Email address of the customer"
-                    },
-                    "customer_phone": {
-                        "type": "string",
-                        "description": "Phone number of the customer"
-                    },
-                    "street_address": {
-                        "type": "string",
-                        "description": "Street address including house/building number and street name"
-                    },
-                    "city": {
-                        "type": "string",
-                        "description": "City name"
-                    },
-                    "state": {
-                        "type": "string",
-                        "description": "State name or abbreviation"
-                    },
-                    "zip_code": {
-                        "type": "string",
-                        "description": "ZIP or postal code"
-                    },
-                    "product_ids": {
-                        "type": "array",
-                        "items": {"type": "integer"},
-                        "description": "List of product IDs to order"
-                    },
-                    "quantities": {
-                        "type": "array",
-                        "items": {"type": "integer"},
-                        "description": "List of quantities for each product (must match length of product_ids)"
-                    }
-                },
+                "properties": _ORDER_FIELDS,
                 "required": ["customer_name", "customer_email", "customer_phone", "street_address", "city", "state", "zip_code", "product_ids", "quantities"]
             }
         }
@@ -271,17 +244,23 @@ TOOL_SCHEMAS = [
 ]
 
 
-def get_tool_descriptions() -> dict:
+# Name -> schema and name -> description, built once at import
+_TOOL_BY_NAME = {tool["function"]["name"]: tool for tool in TOOL_SCHEMAS}
+# Names the model may call, for O(1) membership checks before dispatch
+TOOL_NAMES = frozenset(_TOOL_BY_NAME)
+# Read-only view, so every caller can share the one mapping
+_TOOL_DESCRIPTIONS = MappingProxyType(
+    {name: tool["function"]["description"] for name, tool in _TOOL_BY_NAME.items()}
+)
+
+
+def get_tool_descriptions() -> Mapping[str, str]:
     """Get human-readable descriptions of all available tools.
     
     Returns:
-        Dictionary mapping tool names to descriptions
+        Read-only mapping of tool names to descriptions (copy with dict() to modify)
     """
-    descriptions = {}
-    for tool in TOOL_SCHEMAS:
-        func = tool["function"]
-        descriptions[func["name"]] = func["description"]
-    return descriptions
+    return _TOOL_DESCRIPTIONS
 
 
 def get_tool_by_name(name: str) -> dict:
@@ -293,8 +272,4 @@ def get_tool_by_name(name: str) -> dict:
     Returns:
         Tool schema dictionary or None
     """
-    for tool in TOOL_SCHEMAS:
-        if tool["function"]["name"] == name:
-            return tool
-    return None
-
+    return _TOOL_BY_NAME.get(name)
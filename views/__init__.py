@@ -0,0 +1,2 @@
+"""Views package for pages reached only via in-app links."""
+